@@ -1,12 +1,14 @@
 import os
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
+from sqlalchemy import engine_from_config, make_url
 from sqlalchemy import pool
 
 from alembic import context
 
 from todo_app import db
+import todo_app.models  # noqa: F401, registers the tables on db.metadata
+from todo_app.config import DATABASE_URL, SHARD_URLS
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -48,6 +50,15 @@ target_metadata = [db.metadata]
 # ... etc.
 
 
+def shard_urls() -> list:
+    """Shard 0 is DATABASE_URL or the url of alembic.ini, then SHARD_URLS.
+
+    Every shard gets the same schema. Migrations can read
+    `config.attributes["shard"]` for shard 0 only data.
+    """
+    return [DATABASE_URL or config.get_main_option("sqlalchemy.url"), *SHARD_URLS]
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -60,16 +71,21 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
-    context.configure(
-        url=url,
-        target_metadata=target_metadata,
-        literal_binds=True,
-        dialect_opts={"paramstyle": "named"},
-    )
+    for shard, url in enumerate(shard_urls()):
+        config.attributes["shard"] = shard
+        context.configure(
+            url=url,
+            target_metadata=target_metadata,
+            literal_binds=True,
+            dialect_opts={"paramstyle": "named"},
+        )
+        # the script of every shard starts with the database it is for
+        context.get_context().impl.static_output(
+            f"-- shard {shard}: {make_url(url).render_as_string(hide_password=True)}"
+        )
 
-    with context.begin_transaction():
-        context.run_migrations()
+        with context.begin_transaction():
+            context.run_migrations()
 
 
 def run_migrations_online() -> None:
@@ -79,17 +95,22 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-
-        with context.begin_transaction():
-            context.run_migrations()
+    for shard, url in enumerate(shard_urls()):
+        config.attributes["shard"] = shard
+        connectable = engine_from_config(
+            {
+                **config.get_section(config.config_ini_section, {}),
+                "sqlalchemy.url": url,
+            },
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+        )
+
+        with connectable.connect() as connection:
+            context.configure(connection=connection, target_metadata=target_metadata)
+
+            with context.begin_transaction():
+                context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,192 @@
+"""Load test of the existing routes against a running server.
+
+Registers a throwaway user, creates a tasklist with tasks, then runs
+`--concurrency` clients for `--duration` seconds, each picking a route by
+weight on its own keep-alive connection. `--streams` also holds that many
+idle GET /events streams open during the run, which is what separates the
+gevent and gthread worker classes.
+
+Start the server in the mode to measure, then run the test against it:
+
+    GUNICORN_WORKER_CLASS=gthread GUNICORN_BIND=127.0.0.1:8000 gunicorn -c gunicorn.conf.py
+    python benchmarks/load.py --url http://127.0.0.1:8000 --concurrency 64 --streams 200
+"""
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+import statistics
+import http.client
+from urllib.parse import urlsplit
+from collections import defaultdict
+
+
+class Client:
+    def __init__(self, url: str, token: str | None = None):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port)
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    def request(self, method: str, path: str, body=None):
+        data = json.dumps(body) if body is not None else None
+        self.connection.request(method, path, body=data, headers=self.headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def json(self, method: str, path: str, body=None):
+        status, payload = self.request(method, path, body)
+        if status >= 400:
+            raise RuntimeError(f"{method} {path} failed with {status}: {payload}")
+        return json.loads(payload)
+
+
+def setup(url: str, tasks: int):
+    client = Client(url)
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    user = {"email": email, "full_name": "Load Test", "password": "load-test"}
+    client.json("POST", "/register", {**user, "confirm_password": "load-test"})
+    tokens = client.json("POST", "/login", user)
+
+    client = Client(url, tokens["access"])
+    tasklist = client.json("POST", "/tasklist", {"title": "Load test"})
+    task_ids = []
+    for i in range(tasks):
+        task = client.json(
+            "POST",
+            f"/tasklist/{tasklist['id']}/tasks",
+            {"title": f"Task {i} load test", "due_date": "2030-01-01T00:00:00"},
+        )
+        task_ids.append(task["id"])
+
+    return tokens["access"], tasklist["id"], task_ids
+
+
+def routes(tasklist_id: str, task_ids: list[str]):
+    """(name, weight, operation) of the request mix"""
+    base = f"/tasklist/{tasklist_id}/tasks"
+    return [
+        ("GET /tasklist", 20, lambda: ("GET", "/tasklist", None)),
+        ("GET tasks", 30, lambda: ("GET", base, None)),
+        (
+            "GET task",
+            20,
+            lambda: ("GET", f"{base}/{random.choice(task_ids)}", None),
+        ),
+        ("GET /tasks/upcoming", 10, lambda: ("GET", "/tasks/upcoming", None)),
+        ("GET /search", 5, lambda: ("GET", "/search?q=load", None)),
+        ("POST task", 5, lambda: ("POST", base, {"title": "New load test task"})),
+        (
+            "PATCH task",
+            10,
+            lambda: (
+                "PATCH",
+                f"{base}/{random.choice(task_ids)}",
+                {"title": f"Renamed {random.random()}"},
+            ),
+        ),
+    ]
+
+
+def hold_stream(url: str, token: str, stop: threading.Event):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port)
+    connection.request("GET", "/events", headers={"Authorization": f"Bearer {token}"})
+    response = connection.getresponse()
+    while not stop.is_set() and response.fp.readline():
+        pass
+    connection.close()
+
+
+def worker(url, token, mix, deadline, results, lock):
+    client = Client(url, token)
+    names, weights = [m[0] for m in mix], [m[1] for m in mix]
+    operations = dict((m[0], m[2]) for m in mix)
+    local = defaultdict(list)
+    errors = defaultdict(int)
+    while time.monotonic() < deadline:
+        name = random.choices(names, weights)[0]
+        method, path, body = operations[name]()
+        start = time.perf_counter()
+        try:
+            status, _ = client.request(method, path, body)
+        except (OSError, http.client.HTTPException):
+            status = 0
+            client = Client(url, token)
+        local[name].append(time.perf_counter() - start)
+        if status == 0 or status >= 400:
+            errors[name] += 1
+
+    with lock:
+        for name, latencies in local.items():
+            results["latencies"][name].extend(latencies)
+        for name, count in errors.items():
+            results["errors"][name] += count
+
+
+def percentile(values: list[float], p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+def report(results: dict, duration: float):
+    print(
+        f"{'route':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+    )
+    everything = []
+    for name, latencies in sorted(results["latencies"].items()):
+        everything.extend(latencies)
+        print(
+            f"{name:<22}{len(latencies) / duration:>9.1f}"
+            f"{percentile(latencies, 50) * 1000:>9.1f}"
+            f"{percentile(latencies, 95) * 1000:>9.1f}"
+            f"{percentile(latencies, 99) * 1000:>9.1f}"
+            f"{results['errors'][name]:>8}"
+        )
+    print(
+        f"{'total':<22}{len(everything) / duration:>9.1f}"
+        f"{percentile(everything, 50) * 1000:>9.1f}"
+        f"{percentile(everything, 95) * 1000:>9.1f}"
+        f"{percentile(everything, 99) * 1000:>9.1f}"
+        f"{sum(results['errors'].values()):>8}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--streams", type=int, default=0)
+    args = parser.parse_args()
+
+    token, tasklist_id, task_ids = setup(args.url, args.tasks)
+    mix = routes(tasklist_id, task_ids)
+
+    stop = threading.Event()
+    for _ in range(args.streams):
+        threading.Thread(
+            target=hold_stream, args=(args.url, token, stop), daemon=True
+        ).start()
+
+    results = {"latencies": defaultdict(list), "errors": defaultdict(int)}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+    clients = [
+        threading.Thread(
+            target=worker, args=(args.url, token, mix, deadline, results, lock)
+        )
+        for _ in range(args.concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    stop.set()
+
+    report(results, args.duration)
@@ -0,0 +1,124 @@
+"""Startup time benchmark.
+
+Measures, in fresh interpreters so nothing is cached in the process:
+
+- import: `import todo_app`
+- first request: `import todo_app` + `create_app()` + the first request,
+  an unauthenticated GET /tasklist which is answered without the database
+- worker boot: from starting gunicorn until every worker has loaded the
+  app, with and without preloading it in the master
+
+Run it from the repository root:
+
+    python benchmarks/startup.py --runs 5 --workers 4
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_REQUEST = """
+import time
+start = time.perf_counter()
+import todo_app
+imported = time.perf_counter()
+app = todo_app.create_app()
+created = time.perf_counter()
+app.test_client().get("/tasklist")
+done = time.perf_counter()
+print(imported - start, created - imported, done - created, done - start)
+"""
+
+# the repository settings, plus a hook reporting when a worker is ready
+GUNICORN_CONFIG = """
+import sys
+import time
+
+exec(open({config!r}).read())
+
+preload_app = {preload!r}
+
+
+def post_worker_init(worker):
+    print(f"READY {{time.time()}}", file=sys.stderr, flush=True)
+"""
+
+
+def first_request(runs: int):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", FIRST_REQUEST], cwd=ROOT, text=True
+        )
+        samples.append([float(value) for value in output.split()])
+
+    for i, name in enumerate(["import", "create_app", "first request", "total"]):
+        print(f"{name:>16}: {statistics.median(s[i] for s in samples) * 1000:8.1f} ms")
+
+
+def worker_boot(runs: int, workers: int, preload: bool) -> float:
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as config:
+        config.write(
+            GUNICORN_CONFIG.format(
+                config=os.path.join(ROOT, "gunicorn.conf.py"), preload=preload
+            )
+        )
+
+    samples = []
+    try:
+        for _ in range(runs):
+            start = time.time()
+            server = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "gunicorn",
+                    "-c",
+                    config.name,
+                    "-w",
+                    str(workers),
+                    "-b",
+                    "127.0.0.1:0",
+                ],
+                cwd=ROOT,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            ready = []
+            try:
+                for line in server.stderr:
+                    if line.startswith("READY "):
+                        ready.append(float(line.split()[1]))
+                        if len(ready) == workers:
+                            break
+            finally:
+                server.terminate()
+                server.wait()
+            if len(ready) < workers:
+                raise RuntimeError("gunicorn exited before every worker booted")
+            samples.append(max(ready) - start)
+    finally:
+        os.unlink(config.name)
+
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"Import to first request, median of {args.runs} runs")
+    first_request(args.runs)
+
+    print(f"Boot of {args.workers} gunicorn workers, median of {args.runs} runs")
+    for preload in (False, True):
+        boot = worker_boot(args.runs, args.workers, preload)
+        print(f"{'preload' if preload else 'no preload':>16}: {boot * 1000:8.1f} ms")
@@ -0,0 +1,70 @@
+# Gunicorn settings, used by start.sh. Every value can be overridden with
+# the environment variables below.
+#
+# GUNICORN_WORKER_CLASS picks the concurrency model:
+# - gevent (default): each request is a greenlet, so thousands of mostly
+#   idle connections (GET /events streams) are cheap. psycopg2 is made
+#   cooperative with psycogreen and the pool bounds the open connections.
+# - gthread: each worker serves GUNICORN_THREADS requests on real threads,
+#   the pool gets a connection per thread. Every /events stream holds a
+#   thread for as long as it is open.
+#
+# The app is built once in the master (preload) and inherited by every
+# worker, create_app disposes the connection pools in each forked worker.
+import os
+import multiprocessing
+
+WORKER_CLASSES = ("gevent", "gthread")
+
+cpus = multiprocessing.cpu_count()
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+if worker_class not in WORKER_CLASSES:
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be one of {WORKER_CLASSES}")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:80")
+wsgi_app = "todo_app:create_app()"
+preload_app = True
+
+# a worker per CPU: concurrency comes from greenlets or threads within each
+# worker, more processes would only multiply the database connections
+workers = int(os.getenv("GUNICORN_WORKERS", str(cpus)))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# a per process cache is never invalidated by the writes of the other workers
+if workers > 1 and os.getenv("CACHE_URL", "").startswith("memory://"):
+    raise ValueError("CACHE_URL=memory:// only works with GUNICORN_WORKERS=1")
+
+if worker_class == "gevent":
+    # Preloading imports the app before the workers patch the stdlib, so
+    # the patching happens here, before anything else is imported
+    from gevent import monkey
+
+    monkey.patch_all()
+
+    # psycopg2 blocks in C, the wait callback lets other greenlets run while
+    # a query waits on the database
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
+
+# DB_MAX_CONNECTIONS is what all the workers may open on each database, keep
+# it below the max_connections of Postgres (100 by default) with room for the
+# maintenance commands and migrations. Every worker also keeps one LISTEN
+# connection per database for GET /events, outside of its pool
+max_connections = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+connections_per_worker = max(1, max_connections // workers - 1)
+
+if worker_class == "gevent":
+    # greenlets wait for a free connection instead of opening one each
+    pool_size = min(10, connections_per_worker)
+    max_overflow = min(10, connections_per_worker - pool_size)
+else:
+    # a connection per thread, so a request never waits on the pool
+    pool_size = min(threads, connections_per_worker)
+    max_overflow = min(2, connections_per_worker - pool_size)
+os.environ.setdefault("DB_POOL_SIZE", str(pool_size))
+os.environ.setdefault("DB_MAX_OVERFLOW", str(max_overflow))
@@ -1,4 +1,7 @@
 #!/bin/sh
-alembic upgrade head
+case "$DATABASE_URL" in
+    sqlite*) flask --app todo_app create-db ;;
+    *) alembic upgrade head ;;
+esac
 
-gunicorn -w 4 -b 0.0.0.0:80 todo_app:app
\ No newline at end of file
+gunicorn -c gunicorn.conf.py
\ No newline at end of file
@@ -0,0 +1,45 @@
+import uuid
+import pytest
+
+from todo_app import create_app, db
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/todo.db"})
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(client):
+    """Register a new user, returns the headers of its requests"""
+
+    def make_user(email: str | None = None) -> dict:
+        email = email or f"{uuid.uuid4().hex[:8]}@example.com"
+        client.post(
+            "/register",
+            json={
+                "email": email,
+                "full_name": "Test User",
+                "password": "secret",
+                "confirm_password": "secret",
+            },
+        )
+        response = client.post("/login", json={"email": email, "password": "secret"})
+        return {"Authorization": f"Bearer {response.json['access']}"}
+
+    return make_user
+
+
+@pytest.fixture
+def auth_headers(make_user):
+    return make_user()
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from todo_app import db
+from todo_app.models import Task, ArchivedTask, ArchivedStep
+
+
+def test_old_completed_tasks_are_archived_and_still_listed(app, client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "home"}, headers=auth_headers
+    ).json["id"]
+    base = f"/tasklist/{tasklist_id}/tasks"
+    ids = {}
+    for title in ("old", "recent", "open"):
+        ids[title] = client.post(
+            base,
+            json={"title": title, "steps": [{"title": f"{title} step"}]},
+            headers=auth_headers,
+        ).json["id"]
+    for title in ("old", "recent"):
+        client.patch(
+            f"{base}/{ids[title]}", json={"is_completed": True}, headers=auth_headers
+        )
+    with app.app_context():
+        db.session.execute(
+            update(Task)
+            .where(Task.title == "old")
+            .values(completed_at=datetime.utcnow() - timedelta(days=40))
+        )
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(
+        args=["archive-completed", "--older-than-days", "30"]
+    )
+
+    assert "Archived 1 tasks on shard 0" in result.output
+    with app.app_context():
+        assert [task.title for task in db.session.query(ArchivedTask)] == ["old"]
+        assert [step.title for step in db.session.query(ArchivedStep)] == ["old step"]
+        assert db.session.query(Task).count() == 2
+
+    completed = client.get(f"{base}?is_completed=true", headers=auth_headers).json
+    assert [task["title"] for task in completed] == ["recent", "old"]
+    assert completed[1]["steps"][0]["title"] == "old step"
+    open_tasks = client.get(base, headers=auth_headers).json
+    assert [task["title"] for task in open_tasks] == ["open"]
+    response = client.patch(
+        f"{base}/{ids['old']}", json={"title": "renamed"}, headers=auth_headers
+    )
+    assert response.status_code == 404
@@ -0,0 +1,60 @@
+from todo_app.events import broker
+
+
+def _batch(client, headers, tasklist_id, atomic):
+    return client.post(
+        "/batch",
+        json={
+            "atomic": atomic,
+            "operations": [
+                {"method": "POST", "path": "/tasklist", "body": {"title": "first"}},
+                # no error handler for the TypeError of a list body
+                {"method": "PUT", "path": f"/tasklist/{tasklist_id}", "body": [1]},
+                {"method": "POST", "path": "/tasklist", "body": {"title": "last"}},
+            ],
+        },
+        headers=headers,
+    )
+
+
+def _titles(client, headers):
+    return [
+        tasklist["title"] for tasklist in client.get("/tasklist", headers=headers).json
+    ]
+
+
+def test_batch_unhandled_error_rolls_back_only_its_operation(client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "existing"}, headers=auth_headers
+    ).json["id"]
+
+    response = _batch(client, auth_headers, tasklist_id, atomic=False)
+
+    assert response.status_code == 200
+    assert response.json["committed"] is True
+    assert [result["status"] for result in response.json["results"]] == [201, 500, 201]
+    assert _titles(client, auth_headers) == ["existing", "first", "last"]
+
+
+def test_batch_unhandled_error_rolls_back_atomic_batch(client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "existing"}, headers=auth_headers
+    ).json["id"]
+
+    response = _batch(client, auth_headers, tasklist_id, atomic=True)
+
+    assert response.status_code == 200
+    assert response.json["committed"] is False
+    assert [result["status"] for result in response.json["results"]] == [201, 500]
+    assert _titles(client, auth_headers) == ["existing"]
+
+
+def test_batch_refuses_event_streams(client, auth_headers):
+    response = client.post(
+        "/batch",
+        json={"operations": [{"method": "GET", "path": "/events"}]},
+        headers=auth_headers,
+    )
+
+    assert response.json["results"][0]["status"] == 400
+    assert not broker._subscribers
@@ -0,0 +1,36 @@
+def test_duplicate_copies_open_tasks_with_their_steps(client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "source"}, headers=auth_headers
+    ).json["id"]
+    for title in ("first", "second", "done"):
+        client.post(
+            f"/tasklist/{tasklist_id}/tasks",
+            json={"title": title, "steps": [{"title": f"{title} step"}]},
+            headers=auth_headers,
+        )
+    done = client.get(f"/tasklist/{tasklist_id}/tasks", headers=auth_headers).json[-1]
+    client.patch(
+        f"/tasklist/{tasklist_id}/tasks/{done['id']}",
+        json={"is_completed": True},
+        headers=auth_headers,
+    )
+
+    response = client.post(
+        f"/tasklist/{tasklist_id}/duplicate",
+        json={"title": "copy"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 201
+    tasks = sorted(
+        client.get(f"/tasklist/{response.json['id']}/tasks", headers=auth_headers).json,
+        key=lambda task: task["order"],
+    )
+    assert [(task["order"], task["title"]) for task in tasks] == [
+        (1, "first"),
+        (2, "second"),
+    ]
+    assert [[step["title"] for step in task["steps"]] for task in tasks] == [
+        ["first step"],
+        ["second step"],
+    ]
@@ -0,0 +1,63 @@
+import pytest
+
+from todo_app import db
+from todo_app import cache as cache_module
+from todo_app.cache import LocalCache, cached, invalidate_tasklists, tasklists_key
+
+
+@pytest.fixture
+def local_cache(monkeypatch):
+    monkeypatch.setattr(cache_module, "cache", LocalCache())
+
+
+def test_write_invalidates_cached_tasklists(client, auth_headers, local_cache):
+    client.post("/tasklist", json={"title": "first"}, headers=auth_headers)
+    assert len(client.get("/tasklist", headers=auth_headers).json) == 1
+
+    client.post("/tasklist", json={"title": "second"}, headers=auth_headers)
+    assert len(client.get("/tasklist", headers=auth_headers).json) == 2
+
+
+def test_payload_built_before_a_commit_is_not_served(app, local_cache):
+    user_id = "8d2b0d55-6f0a-4f52-9d7c-2a4d3a0f6f1e"
+    with app.app_context():
+        # a reader picks its key, a writer commits, then the reader stores
+        # what it read before the commit
+        key = tasklists_key(user_id)
+        invalidate_tasklists(user_id)
+        db.session.commit()
+        cached(key, lambda: "stale")
+
+        assert cached(tasklists_key(user_id), lambda: "fresh") == "fresh"
+
+
+def test_rolled_back_batch_is_not_cached(client, auth_headers, local_cache):
+    response = client.post(
+        "/batch",
+        json={
+            "atomic": True,
+            "operations": [
+                {"method": "POST", "path": "/tasklist", "body": {"title": "phantom"}},
+                {"method": "GET", "path": "/tasklist"},
+                {"method": "GET", "path": "/tasklist/not-a-tasklist"},
+            ],
+        },
+        headers=auth_headers,
+    )
+
+    assert response.json["committed"] is False
+    assert response.json["results"][1]["body"][0]["title"] == "phantom"
+    assert client.get("/tasklist", headers=auth_headers).json == []
+
+
+def test_evicted_generation_does_not_revive_old_entries(
+    client, auth_headers, local_cache
+):
+    assert client.get("/tasklist", headers=auth_headers).json == []
+    client.post("/tasklist", json={"title": "first"}, headers=auth_headers)
+
+    # evict every generation, the cached entries stay
+    cache = cache_module.cache
+    cache.delete(*[key for key in cache._data if ":generation:" in key])
+
+    assert len(client.get("/tasklist", headers=auth_headers).json) == 1
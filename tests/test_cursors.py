@@ -0,0 +1,22 @@
+import pytest
+from pydantic import ValidationError
+
+from todo_app.pagination import encode_cursor
+from todo_app.schemas import SearchQueryScheme, SmartViewQueryScheme
+
+
+@pytest.mark.parametrize(
+    "values", [(1, "task", 5), ([1], "task", "x"), (1, "task", "not-a-uuid")]
+)
+def test_search_cursor_rejects_malformed_values(values):
+    with pytest.raises(ValidationError):
+        SearchQueryScheme(q="milk", cursor=encode_cursor(*values))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [("2024-01-01T00:00:00", 5), (5, "x"), ("2024-01-01T00:00:00", "not-a-uuid")],
+)
+def test_smart_view_cursor_rejects_malformed_values(values):
+    with pytest.raises(ValidationError):
+        SmartViewQueryScheme(cursor=encode_cursor(*values))
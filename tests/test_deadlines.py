@@ -0,0 +1,29 @@
+import time
+import sqlite3
+
+import pytest
+from flask import g
+from sqlalchemy.exc import TimeoutError
+
+from todo_app.deadlines import DeadlineQueuePool
+
+
+def test_checkout_waits_no_longer_than_the_budget(app, tmp_path):
+    pool = DeadlineQueuePool(
+        lambda: sqlite3.connect(tmp_path / "pool.db"),
+        pool_size=1,
+        max_overflow=0,
+        timeout=30,
+    )
+    connection = pool.connect()
+
+    with app.test_request_context():
+        g.deadline = time.monotonic() + 0.2
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            pool.connect()
+        assert time.monotonic() - start < 1
+
+    assert pool.timeout() == 30
+    connection.close()
+    assert pool.recreate().timeout() == 30
@@ -0,0 +1,61 @@
+from sqlalchemy import event
+
+from todo_app import db
+
+
+def _statements(app):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", record)
+    return statements
+
+
+def test_fields_select_only_the_requested_columns(app, client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "home"}, headers=auth_headers
+    ).json["id"]
+    client.post(
+        f"/tasklist/{tasklist_id}/tasks",
+        json={
+            "title": "paint",
+            "description": "the fence",
+            "steps": [{"title": "buy paint"}],
+        },
+        headers=auth_headers,
+    )
+    statements = _statements(app)
+
+    response = client.get(
+        f"/tasklist/{tasklist_id}/tasks?fields=title,steps", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    [task] = response.json
+    assert set(task) == {"id", "title", "steps"}
+    assert [step["title"] for step in task["steps"]] == ["buy paint"]
+    [select_tasks] = [s for s in statements if s.lstrip().startswith("SELECT tasks.")]
+    assert "tasks.title" in select_tasks
+    assert "tasks.description" not in select_tasks
+
+
+def test_fields_on_a_single_tasklist(client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist",
+        json={"title": "home", "description": "chores"},
+        headers=auth_headers,
+    ).json["id"]
+
+    response = client.get(f"/tasklist/{tasklist_id}?fields=title", headers=auth_headers)
+
+    assert response.json == {"id": tasklist_id, "title": "home"}
+
+
+def test_unknown_fields_are_rejected(client, auth_headers):
+    response = client.get("/tasklist?fields=title,secret", headers=auth_headers)
+
+    assert response.status_code == 422
+    assert response.json["data"][0]["loc"] == ["fields"]
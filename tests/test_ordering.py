@@ -0,0 +1,65 @@
+def _titles(items: list) -> list:
+    ordered = sorted(items, key=lambda item: item["order"])
+    assert [item["order"] for item in ordered] == list(range(1, len(items) + 1))
+    return [item["title"] for item in ordered]
+
+
+def test_reorder_tasklists_shifts_the_siblings(client, auth_headers):
+    ids = {
+        title: client.post(
+            "/tasklist", json={"title": title}, headers=auth_headers
+        ).json["id"]
+        for title in "abcd"
+    }
+
+    # up: the tasklists in between move down by one
+    response = client.patch(
+        "/tasklist", json={"id": ids["d"], "order": 2}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert _titles(response.json) == ["a", "d", "b", "c"]
+
+    # down: the tasklists in between move up by one
+    response = client.patch(
+        "/tasklist", json={"id": ids["a"], "order": 3}, headers=auth_headers
+    )
+    assert _titles(response.json) == ["d", "b", "a", "c"]
+    assert _titles(client.get("/tasklist", headers=auth_headers).json) == [
+        "d",
+        "b",
+        "a",
+        "c",
+    ]
+
+    response = client.patch(
+        "/tasklist", json={"id": ids["a"], "order": 5}, headers=auth_headers
+    )
+    assert response.status_code == 422
+
+
+def test_reorder_tasks_shifts_the_siblings(client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "list"}, headers=auth_headers
+    ).json["id"]
+    base = f"/tasklist/{tasklist_id}/tasks"
+    ids = {
+        title: client.post(base, json={"title": title}, headers=auth_headers).json["id"]
+        for title in "abcd"
+    }
+
+    response = client.patch(
+        base, json={"id": ids["c"], "order": 1}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert _titles(response.json) == ["c", "a", "b", "d"]
+
+    response = client.patch(
+        base, json={"id": ids["c"], "order": 4}, headers=auth_headers
+    )
+    assert _titles(response.json) == ["a", "b", "d", "c"]
+    assert _titles(client.get(base, headers=auth_headers).json) == [
+        "a",
+        "b",
+        "d",
+        "c",
+    ]
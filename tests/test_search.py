@@ -0,0 +1,44 @@
+def test_search_pages_through_every_match(client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "groceries"}, headers=auth_headers
+    ).json["id"]
+    for i in range(5):
+        client.post(
+            f"/tasklist/{tasklist_id}/tasks",
+            json={
+                "title": f"task {i}",
+                "description": "buy milk",
+                "steps": [{"title": "find the milk shop"}],
+            },
+            headers=auth_headers,
+        )
+    client.post(
+        f"/tasklist/{tasklist_id}/tasks", json={"title": "bread"}, headers=auth_headers
+    )
+
+    results, cursor = [], None
+    while True:
+        url = "/search?q=milk&limit=3" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url, headers=auth_headers).json
+        results += page["results"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(results) == 10
+    assert len({(result["type"], result["id"]) for result in results}) == 10
+    assert sorted(result["type"] for result in results) == ["step"] * 5 + ["task"] * 5
+
+
+def test_search_only_returns_own_tasks(client, auth_headers, make_user):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "groceries"}, headers=auth_headers
+    ).json["id"]
+    client.post(
+        f"/tasklist/{tasklist_id}/tasks", json={"title": "milk"}, headers=auth_headers
+    )
+
+    response = client.get("/search?q=milk", headers=make_user())
+
+    assert response.status_code == 200
+    assert response.json["results"] == []
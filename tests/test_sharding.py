@@ -0,0 +1,130 @@
+import pytest
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from todo_app import create_app, db
+from todo_app.maintenance import move_user
+from todo_app.models import User, UserDirectory
+from todo_app.transaction import shard_engine
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/todo.db",
+            "SQLALCHEMY_BINDS": {"shard1": f"sqlite:///{tmp_path}/shard1.db"},
+        }
+    )
+    with app.app_context():
+        for shard in (0, 1):
+            db.metadata.create_all(shard_engine(shard))
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # init_app registers a metadata per bind key on the shared extension
+    db.metadatas.pop("shard1", None)
+
+
+def _register(client, email):
+    return client.post(
+        "/register",
+        json={
+            "email": email,
+            "full_name": "Test User",
+            "password": "secret",
+            "confirm_password": "secret",
+        },
+    )
+
+
+def _user_row(shard, email):
+    with shard_engine(shard).connect() as connection:
+        return connection.execute(
+            select(User.id, User.is_active).where(User.email == email)
+        ).first()
+
+
+def _directory_shard(email):
+    shard = db.session.scalar(
+        select(UserDirectory.shard).where(UserDirectory.email == email)
+    )
+    db.session.rollback()
+    return shard
+
+
+def test_register_writes_user_and_directory(app, client):
+    assert _register(client, "a@example.com").status_code == 200
+    assert _register(client, "a@example.com").status_code == 400
+
+    with app.app_context():
+        assert _directory_shard("a@example.com") == 0
+        assert _user_row(0, "a@example.com").is_active
+        assert _user_row(1, "a@example.com") is None
+
+    response = client.post(
+        "/login", json={"email": "a@example.com", "password": "secret"}
+    )
+    assert response.status_code == 200
+
+
+def test_move_user_copies_everything_and_keeps_old_tokens(app, client, make_user):
+    headers = make_user("move@example.com")
+    tasklist = client.post("/tasklist", json={"title": "Inbox"}, headers=headers).json
+    client.post(
+        f"/tasklist/{tasklist['id']}/tasks", json={"title": "Moved"}, headers=headers
+    )
+
+    with app.app_context():
+        move_user("move@example.com", 1)
+        assert _directory_shard("move@example.com") == 1
+        assert _user_row(0, "move@example.com") is None
+        assert _user_row(1, "move@example.com").is_active
+
+    # the token still names shard 0, the user is found through the directory
+    response = client.get(f"/tasklist/{tasklist['id']}/tasks", headers=headers)
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json] == ["Moved"]
+
+
+def test_move_user_keeps_inactive_users_inactive(app, make_user):
+    make_user("inactive@example.com")
+
+    with app.app_context():
+        with shard_engine(0).begin() as connection:
+            connection.execute(
+                update(User)
+                .where(User.email == "inactive@example.com")
+                .values(is_active=False)
+            )
+        move_user("inactive@example.com", 1)
+        assert not _user_row(1, "inactive@example.com").is_active
+
+
+def test_failed_move_restores_the_source(app, client, make_user):
+    headers = make_user("stuck@example.com")
+    client.post("/tasklist", json={"title": "Inbox"}, headers=headers)
+
+    with app.app_context():
+        user_id = _user_row(0, "stuck@example.com").id
+        # a leftover row with the same id makes the copy fail
+        with shard_engine(1).begin() as connection:
+            connection.execute(
+                insert(User).values(
+                    id=user_id,
+                    email="leftover@example.com",
+                    full_name="Leftover",
+                    password="x",
+                )
+            )
+
+        with pytest.raises(IntegrityError):
+            move_user("stuck@example.com", 1)
+
+        assert _directory_shard("stuck@example.com") == 0
+        assert _user_row(0, "stuck@example.com").is_active
+
+    response = client.get("/tasklist", headers=headers)
+    assert response.status_code == 200
+    assert [tasklist["title"] for tasklist in response.json] == ["Inbox"]
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+
+def _due(days: int) -> str:
+    day = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    return (day + timedelta(days=days)).isoformat()
+
+
+def _titles(client, headers, view: str) -> list:
+    return [task["title"] for task in client.get(view, headers=headers).json["results"]]
+
+
+def test_views_split_open_tasks_by_due_date(client, auth_headers):
+    tasklist_id = client.post(
+        "/tasklist", json={"title": "work"}, headers=auth_headers
+    ).json["id"]
+    for title, days in (("late", -2), ("now", 0), ("soon", 1), ("later", 7)):
+        client.post(
+            f"/tasklist/{tasklist_id}/tasks",
+            json={"title": title, "due_date": _due(days)},
+            headers=auth_headers,
+        )
+    done = client.post(
+        f"/tasklist/{tasklist_id}/tasks",
+        json={"title": "done", "due_date": _due(-1)},
+        headers=auth_headers,
+    ).json
+    client.patch(
+        f"/tasklist/{tasklist_id}/tasks/{done['id']}",
+        json={"is_completed": True},
+        headers=auth_headers,
+    )
+    client.post(
+        f"/tasklist/{tasklist_id}/tasks",
+        json={"title": "someday"},
+        headers=auth_headers,
+    )
+
+    assert _titles(client, auth_headers, "/tasks/overdue") == ["late"]
+    assert _titles(client, auth_headers, "/tasks/today") == ["now"]
+    assert _titles(client, auth_headers, "/tasks/upcoming") == ["soon", "later"]
+
+
+def test_views_page_across_tasklists(client, auth_headers, make_user):
+    for tasklist in ("a", "b"):
+        tasklist_id = client.post(
+            "/tasklist", json={"title": tasklist}, headers=auth_headers
+        ).json["id"]
+        for day in range(1, 4):
+            client.post(
+                f"/tasklist/{tasklist_id}/tasks",
+                json={"title": f"{tasklist}{day}", "due_date": _due(day)},
+                headers=auth_headers,
+            )
+    deleted_id = client.post(
+        "/tasklist", json={"title": "deleted"}, headers=auth_headers
+    ).json["id"]
+    client.post(
+        f"/tasklist/{deleted_id}/tasks",
+        json={"title": "gone", "due_date": _due(1)},
+        headers=auth_headers,
+    )
+    client.delete(f"/tasklist/{deleted_id}", headers=auth_headers)
+
+    titles, cursor = [], None
+    while True:
+        url = "/tasks/upcoming?limit=4" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url, headers=auth_headers).json
+        titles += [task["title"] for task in page["results"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(titles[:2]) == ["a1", "b1"]
+    assert sorted(titles) == ["a1", "a2", "a3", "b1", "b2", "b3"]
+    assert _titles(client, make_user(), "/tasks/upcoming") == []
@@ -0,0 +1,41 @@
+from todo_app import db
+from todo_app.models import TaskList, Task, Step
+
+
+def test_deleted_tasklist_is_hidden_then_purged(app, client, auth_headers):
+    kept_id = client.post(
+        "/tasklist", json={"title": "kept"}, headers=auth_headers
+    ).json["id"]
+    deleted_id = client.post(
+        "/tasklist", json={"title": "deleted"}, headers=auth_headers
+    ).json["id"]
+    for i in range(3):
+        client.post(
+            f"/tasklist/{deleted_id}/tasks",
+            json={"title": f"task {i}", "steps": [{"title": "step"}]},
+            headers=auth_headers,
+        )
+
+    assert (
+        client.delete(f"/tasklist/{deleted_id}", headers=auth_headers).status_code
+        == 200
+    )
+
+    assert [t["id"] for t in client.get("/tasklist", headers=auth_headers).json] == [
+        kept_id
+    ]
+    assert (
+        client.get(f"/tasklist/{deleted_id}", headers=auth_headers).status_code == 404
+    )
+    response = client.get(f"/tasklist/{deleted_id}/tasks", headers=auth_headers)
+    assert response.status_code == 404
+    with app.app_context():
+        assert db.session.query(Task).count() == 3
+
+    result = app.test_cli_runner().invoke(args=["purge-deleted", "--batch-size", "2"])
+
+    assert "Purged 1 tasklists on shard 0" in result.output
+    with app.app_context():
+        assert [str(t.id) for t in db.session.query(TaskList)] == [kept_id]
+        assert db.session.query(Task).count() == 0
+        assert db.session.query(Step).count() == 0
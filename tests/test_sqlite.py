@@ -0,0 +1,30 @@
+import threading
+
+from todo_app import db
+from todo_app.models import BlackListToken
+
+
+def test_released_savepoint_is_rolled_back_with_the_transaction(app):
+    with app.app_context():
+        savepoint = db.session.begin_nested()
+        db.session.add(BlackListToken())
+        savepoint.commit()
+        db.session.rollback()
+
+        assert db.session.query(BlackListToken).count() == 0
+
+
+def test_concurrent_creates_get_distinct_orders(app, auth_headers):
+    def create(i):
+        app.test_client().post(
+            "/tasklist", json={"title": f"list {i}"}, headers=auth_headers
+        )
+
+    threads = [threading.Thread(target=create, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    tasklists = app.test_client().get("/tasklist", headers=auth_headers).json
+    assert sorted(tasklist["order"] for tasklist in tasklists) == list(range(1, 9))
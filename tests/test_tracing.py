@@ -0,0 +1,20 @@
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from todo_app import db
+
+
+def test_failed_statements_leave_nothing_on_the_connection(app):
+    with app.test_request_context():
+        g.db_queries, g.db_time = 0, 0.0
+        connection = db.session.connection()
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql("SELECT * FROM missing_table")
+        queries = g.db_queries
+        connection.execute(text("SELECT 1"))
+
+        assert g.db_queries == queries + 1
+        assert "query_start" not in connection.info
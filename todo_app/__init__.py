@@ -1,51 +1,128 @@
+import os
+from functools import partial
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from pydantic import ValidationError
-from todo_app.config import PG_URL
+from todo_app.sharding import ShardedSession
 from todo_app.exceptions import (
     AuthorizationException,
     NotFoundException,
     BadRequestException,
+    ServiceUnavailableException,
+    DeadlineExceededException,
 )
 
 
 __name__ = "todo_app"
 
-app = Flask(__name__)
+db = SQLAlchemy(session_options={"class_": ShardedSession})
 
-db = SQLAlchemy()
 
-app.config["SQLALCHEMY_DATABASE_URI"] = PG_URL
-
-db.init_app(app)
-
-
-@app.errorhandler(ValidationError)
 def validate_validation_error(e: ValidationError):
     return (
         jsonify(
             {
                 "message": "Unprocessable Content",
-                "data": e.errors,
+                "data": e.errors(),
             }
         ),
         422,
     )
 
 
-@app.errorhandler(AuthorizationException)
 def validate_auth_error(e: AuthorizationException):
     return jsonify(e.dict()), e.status_code
 
 
-@app.errorhandler(BadRequestException)
 def validate_bad_request_error(e: BadRequestException):
     return jsonify(e.dict()), e.status_code
 
 
-@app.errorhandler(NotFoundException)
 def validate_not_found_error(e: NotFoundException):
     return jsonify(e.dict()), e.status_code
 
 
-import todo_app.routers
+def validate_service_unavailable_error(e: ServiceUnavailableException):
+    return jsonify(e.dict()), e.status_code
+
+
+def validate_deadline_exceeded_error(e: DeadlineExceededException):
+    return jsonify(e.dict()), e.status_code
+
+
+def _dispose_engines(engines: list):
+    # the child keeps the parent's pooled connections open for the parent,
+    # and starts with empty pools of its own
+    for engine in engines:
+        engine.dispose(close=False)
+
+
+def create_app(config: dict | None = None) -> Flask:
+    """Build the application, `config` overrides the settings from env.
+
+    Routes, jwt and the password hasher are only imported here, so that
+    importing `todo_app` for the models (alembic, scripts) stays cheap.
+    The app can be built once in the gunicorn master (`--preload`), every
+    forked worker then disposes the inherited connection pools.
+    """
+    from todo_app.config import (
+        database_url,
+        DB_POOL_SIZE,
+        DB_MAX_OVERFLOW,
+        DB_POOL_TIMEOUT,
+        DB_POOL_RECYCLE,
+    )
+    from todo_app.sharding import shard_binds
+    from todo_app.sqlite import configure_sqlite
+    from todo_app.tracing import configure_logging, trace_requests, trace_queries
+    from todo_app.deadlines import enforce_deadlines, DeadlineQueuePool
+    from todo_app.routers import api
+    from todo_app.maintenance import commands
+
+    configure_logging()
+    app = Flask(__name__)
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url()
+    app.config["SQLALCHEMY_BINDS"] = shard_binds()
+    app.config.update(config or {})
+    # Flask-SQLAlchemy picks the pool of SQLite databases itself
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        app.config.setdefault(
+            "SQLALCHEMY_ENGINE_OPTIONS",
+            {
+                "poolclass": DeadlineQueuePool,
+                "pool_size": DB_POOL_SIZE,
+                "max_overflow": DB_MAX_OVERFLOW,
+                "pool_timeout": DB_POOL_TIMEOUT,
+                "pool_recycle": DB_POOL_RECYCLE,
+                "pool_pre_ping": True,
+            },
+        )
+
+    db.init_app(app)
+
+    trace_requests(app)
+    app.register_blueprint(api)
+    app.register_blueprint(commands)
+
+    app.register_error_handler(ValidationError, validate_validation_error)
+    app.register_error_handler(AuthorizationException, validate_auth_error)
+    app.register_error_handler(BadRequestException, validate_bad_request_error)
+    app.register_error_handler(NotFoundException, validate_not_found_error)
+    app.register_error_handler(
+        ServiceUnavailableException, validate_service_unavailable_error
+    )
+    app.register_error_handler(
+        DeadlineExceededException, validate_deadline_exceeded_error
+    )
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if engine.dialect.name == "sqlite":
+            configure_sqlite(engine)
+        trace_queries(engine)
+        enforce_deadlines(engine)
+    os.register_at_fork(after_in_child=partial(_dispose_engines, engines))
+
+    return app
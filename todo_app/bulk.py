@@ -0,0 +1,166 @@
+import uuid
+import sqlalchemy as sa
+
+from todo_app import db
+from todo_app.models import TaskList, Task, Step
+from todo_app.utils import new_uuid
+from todo_app.ordering import max_order
+from todo_app.transaction import uses_postgresql
+
+
+TASK_COPY_COLUMNS = (
+    "title",
+    "description",
+    "is_completed",
+    "completed_at",
+    "reminder",
+    "due_date",
+)
+STEP_COPY_COLUMNS = ("title", "description", "is_completed")
+
+
+def _copied_tasks(source: TaskList, include_completed: bool):
+    """(id, position) of the tasks of `source` to copy, positions from 1"""
+    query = sa.select(
+        Task.id,
+        sa.func.row_number()
+        .over(order_by=(Task.order, Task.created_at, Task.id))
+        .label("position"),
+    ).where(Task.tasklist_id == source.id)
+    if not include_completed:
+        query = query.where(Task.is_completed == False)  # noqa: E712
+    return query
+
+
+def duplicate_tasklist(
+    source: TaskList, tasklist: TaskList, include_completed: bool = False
+) -> int:
+    """Copy the tasks and steps of `source` into the new, flushed `tasklist`.
+
+    Tasks keep their relative order, renumbered from 1. Nothing is read
+    into Python, the new ids are generated by the database. Returns the
+    number of copied tasks.
+    """
+    tasks = Task.__table__
+    steps = Step.__table__
+    copied = _copied_tasks(source, include_completed).subquery("copied")
+
+    if uses_postgresql():
+        # one statement: the id mapping is materialized once and read by
+        # the insert of the tasks and the insert of their steps
+        ids = (
+            sa.select(
+                copied.c.id.label("old_id"),
+                new_uuid().label("new_id"),
+                copied.c.position,
+            )
+            .cte("id_mapping")
+            .prefix_with("MATERIALIZED")
+        )
+        new_steps = sa.insert(steps).from_select(
+            ["id", "task_id", *STEP_COPY_COLUMNS],
+            sa.select(
+                new_uuid(),
+                ids.c.new_id,
+                *[steps.c[column] for column in STEP_COPY_COLUMNS],
+            ).join_from(steps, ids, steps.c.task_id == ids.c.old_id),
+        )
+        result = db.session.execute(
+            sa.insert(tasks)
+            .from_select(
+                ["id", "tasklist_id", "user_id", "order", *TASK_COPY_COLUMNS],
+                sa.select(
+                    ids.c.new_id,
+                    sa.literal(tasklist.id, sa.Uuid),
+                    sa.literal(tasklist.user_id, sa.Uuid),
+                    ids.c.position,
+                    *[tasks.c[column] for column in TASK_COPY_COLUMNS],
+                ).join_from(tasks, ids, tasks.c.id == ids.c.old_id),
+            )
+            .add_cte(new_steps.cte("new_steps"))
+        )
+        return result.rowcount
+
+    # SQLite has no INSERT in WITH. The steps find their new task by its
+    # position, the write lock of the transaction keeps the source as is
+    # between the two statements
+    result = db.session.execute(
+        sa.insert(tasks).from_select(
+            ["id", "tasklist_id", "user_id", "order", *TASK_COPY_COLUMNS],
+            sa.select(
+                new_uuid(),
+                sa.literal(tasklist.id, sa.Uuid),
+                sa.literal(tasklist.user_id, sa.Uuid),
+                copied.c.position,
+                *[tasks.c[column] for column in TASK_COPY_COLUMNS],
+            ).join_from(tasks, copied, tasks.c.id == copied.c.id),
+        )
+    )
+    new_tasks = tasks.alias("new_tasks")
+    db.session.execute(
+        sa.insert(steps).from_select(
+            ["id", "task_id", *STEP_COPY_COLUMNS],
+            sa.select(
+                new_uuid(),
+                new_tasks.c.id,
+                *[steps.c[column] for column in STEP_COPY_COLUMNS],
+            )
+            .join_from(steps, copied, steps.c.task_id == copied.c.id)
+            .join(
+                new_tasks,
+                sa.and_(
+                    new_tasks.c.tasklist_id == tasklist.id,
+                    new_tasks.c.order == copied.c.position,
+                ),
+            ),
+        )
+    )
+    return result.rowcount
+
+
+def move_tasks(source: TaskList, target: TaskList, task_ids: list[uuid.UUID]) -> int:
+    """Move tasks of `source` to the end of `target`, steps follow them.
+
+    One UPDATE moves the tasks and numbers them after the last task of
+    `target` in their current order, a second one renumbers what is left
+    in `source`. The caller holds the order locks of both tasklists.
+    Returns the number of moved tasks.
+    """
+    moved = (
+        sa.select(
+            Task.id,
+            sa.func.row_number()
+            .over(order_by=(Task.order, Task.created_at, Task.id))
+            .label("position"),
+        )
+        .where(Task.tasklist_id == source.id, Task.id.in_(task_ids))
+        .subquery("moved")
+    )
+    last_order = max_order(Task, Task.tasklist_id == target.id)
+    result = db.session.execute(
+        sa.update(Task)
+        .where(Task.id == moved.c.id)
+        .values(tasklist_id=target.id, order=last_order + moved.c.position)
+        .execution_options(synchronize_session=False)
+    )
+
+    remaining = (
+        sa.select(
+            Task.id,
+            sa.func.row_number()
+            .over(order_by=(Task.order, Task.created_at, Task.id))
+            .label("position"),
+        )
+        .where(Task.tasklist_id == source.id)
+        .subquery("remaining")
+    )
+    db.session.execute(
+        sa.update(Task)
+        .where(
+            Task.id == remaining.c.id,
+            Task.order.is_distinct_from(remaining.c.position),
+        )
+        .values(order=remaining.c.position)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,213 @@
+import time
+import uuid
+import threading
+from typing import Callable, Optional
+from flask import current_app, g
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from todo_app import db
+from todo_app.config import (
+    APP_NAME,
+    CACHE_URL,
+    CACHE_TTL,
+    CACHE_LOCK_TTL,
+    CACHE_GENERATION_TTL,
+)
+
+
+# ----------------- Backends -------------------
+class NullCache:
+    """Backend that keeps nothing, every read goes to the database"""
+
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def set(self, key: str, value: str, ttl: int):
+        pass
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        return True
+
+    def delete(self, *keys: str):
+        pass
+
+
+class LocalCache:
+    """In-process backend for tests and single worker deployments"""
+
+    def __init__(self):
+        self._data: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value, expire = self._data.get(key, (None, 0))
+            if value is not None and expire < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        """Set `key` only if it is missing, returns whether it was set"""
+        with self._lock:
+            _, expire = self._data.get(key, (None, 0))
+            if expire >= time.monotonic():
+                return False
+            self._data[key] = (value, time.monotonic() + ttl)
+            return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class RedisCache:
+    """Backend shared by every worker, speaks the Redis protocol"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: str, ttl: int):
+        self.client.set(key, value, ex=ttl)
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        return bool(self.client.set(key, value, ex=ttl, nx=True))
+
+    def delete(self, *keys: str):
+        self.client.delete(*keys)
+
+
+def make_cache(url: str):
+    if not url:
+        return NullCache()
+    elif url.startswith("memory://"):
+        return LocalCache()
+    elif url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url)
+    raise ValueError(f"Unsupported cache url: {url}")
+
+
+cache = make_cache(CACHE_URL)
+
+
+# ----------------- Keys -------------------
+# Entries are never deleted: a write starts a new generation of the entries
+# it affects, and the key of an entry contains its current generation. A
+# payload built from data read before a commit is written under the old
+# generation, where no reader looks for it anymore.
+def tasklists_generation_key(user_id) -> str:
+    return f"{APP_NAME}:generation:tasklists:{user_id}"
+
+
+def tasks_generation_key(user_id, tasklist_id) -> str:
+    return f"{APP_NAME}:generation:tasks:{user_id}:{tasklist_id}"
+
+
+def _generation(generation_key: str) -> str:
+    generation = cache.get(generation_key)
+    if generation is None:
+        # never written, expired or evicted: start a new generation, entries
+        # of a previous one may predate the last write
+        generation = uuid.uuid4().hex
+        if not cache.add(generation_key, generation, CACHE_GENERATION_TTL):
+            generation = cache.get(generation_key) or generation
+    return generation
+
+
+def tasklists_key(user_id) -> str:
+    generation = _generation(tasklists_generation_key(user_id))
+    return f"{APP_NAME}:tasklists:{user_id}:{generation}"
+
+
+def tasks_key(user_id, tasklist_id, is_completed: bool) -> str:
+    generation = _generation(tasks_generation_key(user_id, tasklist_id))
+    return f"{APP_NAME}:tasks:{user_id}:{tasklist_id}:{generation}:{int(is_completed)}"
+
+
+# ----------------- Reads -------------------
+def cached(key: str, build: Callable[[], str], ttl: int = CACHE_TTL) -> str:
+    """Return the cached value of `key`, building it on a miss.
+
+    Only one worker rebuilds an expired key: the others wait for its value
+    for up to CACHE_LOCK_TTL seconds instead of all hitting the database.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, "1", CACHE_LOCK_TTL):
+        try:
+            value = build()
+            cache.set(key, value, ttl)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + CACHE_LOCK_TTL
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+    return build()
+
+
+def _reads_uncommitted() -> bool:
+    """Whether the session may read changes which can still be rolled back"""
+    session = db.session
+    return bool(
+        g.get("batch_user")
+        or session.info.get("cache_invalidate")
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
+def cached_response(key: str, build: Callable[[], object]):
+    """JSON response for `build()`, the serialized payload is cached.
+
+    A payload which may include uncommitted changes, e.g. of the previous
+    operations of a batch, bypasses the cache.
+    """
+    if _reads_uncommitted():
+        payload = current_app.json.dumps(build())
+    else:
+        payload = cached(key, lambda: current_app.json.dumps(build()))
+    return current_app.response_class(
+        payload, status=200, mimetype=current_app.json.mimetype
+    )
+
+
+# ----------------- Invalidation -------------------
+def invalidate(*generation_keys: str):
+    """Start new generations of `generation_keys` once the current transaction
+    commits"""
+    db.session.info.setdefault("cache_invalidate", set()).update(generation_keys)
+
+
+def invalidate_tasklists(user_id):
+    invalidate(tasklists_generation_key(user_id))
+
+
+def invalidate_tasks(user_id, tasklist_id):
+    invalidate(tasks_generation_key(user_id, tasklist_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    for generation_key in session.info.pop("cache_invalidate", ()):
+        cache.set(generation_key, uuid.uuid4().hex, CACHE_GENERATION_TTL)
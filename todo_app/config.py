@@ -12,6 +12,40 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRES_MINUTES = 30
 REFRESH_TOKEN_EXPIRES_MINUTES = 15 * 24 * 60  # 15 days
 
+# rows deleted per transaction by the `purge-deleted` command
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+
+# completed tasks older than this are moved to the archive tables
+ARCHIVE_COMPLETED_AFTER_DAYS = int(os.getenv("ARCHIVE_COMPLETED_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+# no caching by default. redis://host:port/db is shared by every worker,
+# memory:// keeps entries per process so it only suits a single worker
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_TTL = int(os.getenv("CACHE_TTL", "60"))
+CACHE_LOCK_TTL = 5
+# generations must outlive the entries written under them
+CACHE_GENERATION_TTL = max(24 * 60 * 60, 10 * CACHE_TTL)
+
+# change notifications for GET /events
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "todo_events")
+EVENTS_QUEUE_SIZE = 100
+EVENTS_HEARTBEAT_SECONDS = 15
+
+# JSON request logs, requests and queries slower than these are flagged.
+# EXPLAIN plans of slow queries are sampled, and capped per worker
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+SLOW_QUERY_EXPLAINS_PER_MINUTE = int(os.getenv("SLOW_QUERY_EXPLAINS_PER_MINUTE", "6"))
+
+# connection pool of every engine, per worker process. gunicorn.conf.py sizes
+# it from the worker class and DB_MAX_CONNECTIONS when these are not set
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
 
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "0.0.0.0")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
@@ -20,11 +54,27 @@ POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "todo_pass")
 POSTGRES_DB = os.getenv("POSTGRES_DB", "todo_db")
 
 
-PG_URL = PostgresDsn.build(
-    scheme="postgresql",
-    user=POSTGRES_USER,
-    password=POSTGRES_PASSWORD,
-    host=POSTGRES_HOST,
-    port=POSTGRES_PORT,
-    path=f"/{POSTGRES_DB}",
-)
+def pg_url() -> str:
+    """Url of the main database, built when the app is created"""
+    return PostgresDsn.build(
+        scheme="postgresql",
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        host=POSTGRES_HOST,
+        port=POSTGRES_PORT,
+        path=f"/{POSTGRES_DB}",
+    )
+
+
+# any SQLAlchemy url, e.g. sqlite:////data/todo.db for a single node
+# deployment, overrides the POSTGRES_* settings
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+
+def database_url() -> str:
+    return DATABASE_URL or pg_url()
+
+
+# comma separated urls of extra shards, database_url() is shard 0 and also holds the
+# user directory which maps every user to its shard
+SHARD_URLS = [url for url in os.getenv("SHARD_URLS", "").split(",") if url]
@@ -0,0 +1,78 @@
+import time
+from typing import Optional
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from todo_app.exceptions import DeadlineExceededException
+
+
+# SQLSTATE of a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the budget of the current request, None without one"""
+    if not has_request_context() or "deadline" not in g:
+        return None
+    return g.deadline - time.monotonic()
+
+
+def check_deadline():
+    budget = remaining()
+    if budget is not None and budget <= 0:
+        raise DeadlineExceededException()
+
+
+def is_query_canceled(e: OperationalError) -> bool:
+    return getattr(e.orig, "pgcode", None) == QUERY_CANCELED
+
+
+@event.listens_for(Session, "after_begin")
+def _set_statement_timeout(session: Session, transaction, connection):
+    """Bound every statement of the transaction by the remaining budget"""
+    budget = remaining()
+    if budget is None:
+        return
+    check_deadline()
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(
+            "SET LOCAL statement_timeout = %d" % max(int(budget * 1000), 1)
+        )
+
+
+def _check_before_statement(conn, cursor, statement, parameters, context, executemany):
+    # statement_timeout is set once per transaction, a request running many
+    # short statements is stopped here once its budget is spent
+    check_deadline()
+
+
+def enforce_deadlines(engine):
+    event.listen(engine, "before_cursor_execute", _check_before_statement)
+
+
+class DeadlineQueuePool(QueuePool):
+    """QueuePool whose checkouts wait no longer than the request's budget.
+
+    `pool_timeout` still bounds the wait, and is the only bound outside of
+    requests. A checkout that runs out of time raises TimeoutError, a 503.
+    """
+
+    @property
+    def _timeout(self) -> float:
+        budget = remaining()
+        if budget is None:
+            return self._pool_timeout
+        return max(min(self._pool_timeout, budget), 0)
+
+    @_timeout.setter
+    def _timeout(self, value: float):
+        self._pool_timeout = value
+
+    def recreate(self) -> "DeadlineQueuePool":
+        # the new pool gets the configured timeout, not what is left of a budget
+        pool = super().recreate()
+        pool._timeout = self._pool_timeout
+        return pool
@@ -1,16 +1,52 @@
+import time
+import uuid
 from typing import Callable
 from functools import wraps
 
 from jose import jwt, JWTError
-from flask import request
+from flask import request, g
+from sqlalchemy.exc import OperationalError, TimeoutError
 from todo_app.config import SECRET_KEY, ALGORITHM
-from todo_app.models import User, BlackListToken
-from todo_app.exceptions import AuthorizationException
+from todo_app.models import User, BlackListToken, UserDirectory
+from todo_app.exceptions import (
+    AuthorizationException,
+    DeadlineExceededException,
+    ServiceUnavailableException,
+)
+from todo_app.deadlines import is_query_canceled
+from todo_app.sharding import SHARD_COUNT
+from todo_app.transaction import use_shard
+
+
+def _find_user(payload: dict):
+    """Load the token's user from its shard.
+
+    The shard in the token is tried first, the directory is only consulted
+    for older tokens or users moved to another shard since the token was made.
+    """
+    user_id = uuid.UUID(payload["sub"])
+    shard = payload.get("shd")
+    if shard is not None and 0 <= shard < SHARD_COUNT:
+        use_shard(shard)
+        user = User.query.filter_by(id=user_id).first()
+        if user:
+            return user
+
+    entry = UserDirectory.query.filter_by(user_id=user_id).first()
+    if not entry:
+        return None
+
+    use_shard(entry.shard)
+    return User.query.filter_by(id=user_id).first()
 
 
 def auth_required(func: Callable) -> Callable:
     @wraps(func)
     def wrapper(*args, **kwargs):
+        # operations of a batch request are authenticated once by the batch
+        if g.get("batch_user"):
+            return func(g.batch_user, *args, **kwargs)
+
         token = None
 
         if "Authorization" not in request.headers:
@@ -31,11 +67,13 @@ def auth_required(func: Callable) -> Callable:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             if payload.get("frs"):
                 raise JWTError("Access token need")
-            black_list_token = BlackListToken.query.filter_by(id=payload["jti"]).first()
+            black_list_token = BlackListToken.query.filter_by(
+                id=uuid.UUID(payload["jti"])
+            ).first()
             if black_list_token:
                 raise JWTError("Token is blacklisted")
 
-            user = User.query.filter_by(id=payload["sub"]).first()
+            user = _find_user(payload)
 
             if not user:
                 raise AuthorizationException(message="User not found")
@@ -48,3 +86,32 @@ def auth_required(func: Callable) -> Callable:
         return func(user, *args, **kwargs)
 
     return wrapper
+
+
+def deadline(seconds: float) -> Callable:
+    """Give the request `seconds` to finish.
+
+    The remaining budget bounds the statements of every transaction (see
+    todo_app.deadlines), and the wait for a pooled connection. A cancelled
+    statement becomes a 504, a connection not checked out in time a 503.
+    Operations of a batch share the budget of the batch.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            g.setdefault("deadline", time.monotonic() + seconds)
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                if is_query_canceled(e):
+                    raise DeadlineExceededException() from e
+                raise
+            except TimeoutError as e:
+                raise ServiceUnavailableException(
+                    "No database connection available"
+                ) from e
+
+        return wrapper
+
+    return decorator
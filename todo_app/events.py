@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import queue
+import select
+import logging
+import threading
+from collections import defaultdict
+from sqlalchemy import func, event
+from sqlalchemy import select as sa_select
+from sqlalchemy.orm import Session
+
+from todo_app import db
+from todo_app.config import EVENTS_CHANNEL, EVENTS_QUEUE_SIZE
+from todo_app.transaction import uses_postgresql
+
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = {"tasklists": "tasklist", "tasks": "task", "steps": "step"}
+
+
+def publish(user_id, action: str, obj, **ids):
+    """Notify the user's subscribers that `obj` was created/updated/deleted.
+
+    The notification is sent with `pg_notify` inside the current transaction,
+    so Postgres only delivers it if and when the transaction commits. Other
+    databases have no LISTEN/NOTIFY, their notifications only reach the
+    subscribers of this worker, once the session commits.
+    """
+    db.session.flush()
+
+    payload = {
+        "type": EVENT_TYPES[obj.__tablename__],
+        "action": action,
+        "user_id": str(user_id),
+        "id": str(obj.id),
+    }
+    for key in ("tasklist_id", "task_id"):
+        if hasattr(obj, key):
+            payload[key] = str(getattr(obj, key))
+    payload.update({key: str(value) for key, value in ids.items()})
+
+    if uses_postgresql():
+        db.session.execute(
+            sa_select(func.pg_notify(EVENTS_CHANNEL, json.dumps(payload)))
+        )
+    else:
+        db.session.info.setdefault("events", []).append(json.dumps(payload))
+
+
+class Broker:
+    """Fans out notifications of one LISTEN connection to many subscribers.
+
+    There is one broker per worker process, with a listener thread per shard.
+    The listeners are started by the first subscriber, so they are never
+    inherited through a fork.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, set[queue.Queue]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._listeners: list[threading.Thread] = []
+        self._pid = None
+
+    def subscribe(self, user_id) -> queue.Queue:
+        subscription = queue.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[str(user_id)].add(subscription)
+            self._ensure_listener()
+        return subscription
+
+    def unsubscribe(self, user_id, subscription: queue.Queue):
+        with self._lock:
+            subscriptions = self._subscribers.get(str(user_id))
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[str(user_id)]
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid() and all(t.is_alive() for t in self._listeners):
+            return
+        self._pid = os.getpid()
+        # notifications are sent on the shard of the user, listen on all of them
+        self._listeners = [
+            threading.Thread(
+                target=self._listen,
+                args=(engine,),
+                name=f"events-listener-{bind_key or 'default'}",
+                daemon=True,
+            )
+            for bind_key, engine in db.engines.items()
+            if engine.dialect.name == "postgresql"
+        ]
+        for listener in self._listeners:
+            listener.start()
+
+    def _listen(self, engine):
+        while True:
+            connection = None
+            try:
+                # a dedicated connection, detached so it does not use a pool slot
+                connection = engine.raw_connection()
+                connection.detach()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                dbapi_connection.cursor().execute(f"LISTEN {EVENTS_CHANNEL}")
+
+                while True:
+                    select.select([dbapi_connection], [], [], 60)
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        self._dispatch(dbapi_connection.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Events listener failed, reconnecting")
+                if connection is not None:
+                    connection.close()
+                time.sleep(1)
+
+    def _dispatch(self, payload: str):
+        event = json.loads(payload)
+        with self._lock:
+            subscriptions = list(self._subscribers.get(event["user_id"], ()))
+
+        for subscription in subscriptions:
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                # a slow client missed events, tell it to fetch everything again
+                with subscription.mutex:
+                    subscription.queue.clear()
+                subscription.put_nowait({"type": "resync", "action": "resync"})
+
+
+broker = Broker()
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session: Session):
+    for payload in session.info.pop("events", ()):
+        broker._dispatch(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop("events", None)
@@ -44,3 +44,33 @@ class BadRequestException(Exception):
             "message": self.message,
             "data": self.data,
         }
+
+
+class ServiceUnavailableException(Exception):
+    status_code: int = 503
+
+    def __init__(self, message: Optional[str] = None, data: Optional[dict] = None):
+        super().__init__(message or "Service Unavailable")
+        self.message = message or "Service Unavailable"
+        self.data = data
+
+    def dict(self):
+        return {
+            "message": self.message,
+            "data": self.data,
+        }
+
+
+class DeadlineExceededException(Exception):
+    status_code: int = 504
+
+    def __init__(self, message: Optional[str] = None, data: Optional[dict] = None):
+        super().__init__(message or "Request took too long")
+        self.message = message or "Request took too long"
+        self.data = data
+
+    def dict(self):
+        return {
+            "message": self.message,
+            "data": self.data,
+        }
@@ -0,0 +1,86 @@
+from typing import Optional, Type
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload, noload
+
+
+def parse_fields(scheme: Type[BaseModel], value: Optional[str]) -> Optional[set]:
+    """Parse a `?fields=title,steps` parameter against the response scheme.
+
+    Returns None when no fields were requested, the id is always included.
+    """
+    if not value:
+        return None
+
+    fields = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = fields - scheme.__fields__.keys()
+    if unknown:
+        raise ValidationError(
+            [
+                ErrorWrapper(
+                    ValueError(f"Unknown fields: {', '.join(sorted(unknown))}"),
+                    loc="fields",
+                )
+            ],
+            scheme,
+        )
+
+    if "id" in scheme.__fields__:
+        fields.add("id")
+
+    return fields
+
+
+def _columns(model, fields) -> list:
+    mapper = inspect(model)
+    return [
+        mapper.attrs[field].class_attribute
+        for field in fields
+        if field in mapper.columns
+    ]
+
+
+def field_options(model, scheme: Type[BaseModel], fields: set) -> list:
+    """Loader options which only read the requested columns and relationships.
+
+    Columns outside `fields` are not selected, requested relationships are
+    loaded with one extra SELECT ... IN query restricted to the columns of
+    their nested scheme, and the others are not loaded.
+    """
+    options = [load_only(*_columns(model, fields))]
+
+    for relationship in inspect(model).relationships:
+        attribute = relationship.class_attribute
+        if relationship.key not in fields:
+            options.append(noload(attribute))
+            continue
+
+        nested = scheme.__fields__[relationship.key].type_
+        columns = _columns(relationship.mapper.class_, nested.__fields__)
+        options.append(selectinload(attribute).load_only(*columns))
+
+    return options
+
+
+def dump(obj, scheme: Type[BaseModel], fields: Optional[set] = None) -> dict:
+    """Serialize `obj` with `scheme`, only touching the requested fields"""
+    if fields is None:
+        return scheme.from_orm(obj).dict()
+
+    data = {}
+    for name in fields:
+        value = getattr(obj, name)
+        type_ = scheme.__fields__[name].type_
+        if (
+            value is not None
+            and isinstance(type_, type)
+            and issubclass(type_, BaseModel)
+        ):
+            if isinstance(value, list):
+                value = [type_.from_orm(item).dict() for item in value]
+            else:
+                value = type_.from_orm(value).dict()
+        data[name] = value
+
+    return data
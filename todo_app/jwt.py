@@ -1,4 +1,5 @@
 import uuid
+import logging
 from datetime import timedelta, datetime
 from jose import jwt, JWTError
 
@@ -8,6 +9,9 @@ from todo_app.schemas import User, TokenPair, JwtTokenSchema
 from todo_app.models import BlackListToken
 
 
+logger = logging.getLogger(__name__)
+
+
 def _create_access_token(payload: dict, minutes: int | None = None) -> JwtTokenSchema:
     expire = datetime.utcnow() + timedelta(
         minutes=minutes or config.ACCESS_TOKEN_EXPIRES_MINUTES
@@ -40,8 +44,13 @@ def _create_refresh_token(payload: dict) -> JwtTokenSchema:
     return token
 
 
-def create_token_pair(user: User) -> TokenPair:
-    payload = {"sub": str(user.id), "name": user.full_name, "jti": str(uuid.uuid4())}
+def create_token_pair(user: User, shard: int = 0) -> TokenPair:
+    payload = {
+        "sub": str(user.id),
+        "name": user.full_name,
+        "jti": str(uuid.uuid4()),
+        "shd": shard,
+    }
 
     return TokenPair(
         access=_create_access_token(payload={**payload}),
@@ -54,7 +63,9 @@ def decode_access_token(token: str):
         payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
         if payload.get("frs"):
             raise JWTError("Access token need")
-        black_list_token = BlackListToken.query.filter_by(id=payload["jti"]).first()
+        black_list_token = BlackListToken.query.filter_by(
+            id=uuid.UUID(payload["jti"])
+        ).first()
         if black_list_token:
             raise JWTError("Token is blacklisted")
     except JWTError:
@@ -69,7 +80,7 @@ def refresh_token_state(token: str):
         if not payload.get("frs"):
             raise JWTError("Refresh token need")
     except JWTError as ex:
-        print(str(ex))
+        logger.info("refresh token rejected", extra={"reason": str(ex)})
         raise AuthorizationException()
 
     return {"access": _create_access_token(payload=payload).token}
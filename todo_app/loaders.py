@@ -0,0 +1,56 @@
+import uuid
+from typing import NamedTuple, Optional
+from sqlalchemy import select, and_
+
+from todo_app import db
+from todo_app.models import TaskList, Task, Step
+from todo_app.exceptions import NotFoundException
+
+
+class OwnedResources(NamedTuple):
+    tasklist: TaskList
+    task: Optional[Task] = None
+    step: Optional[Step] = None
+
+
+def load_owned(
+    user_id: uuid.UUID,
+    tasklist_id: uuid.UUID,
+    task_id: Optional[uuid.UUID] = None,
+    step_id: Optional[uuid.UUID] = None,
+    options: tuple = (),
+) -> OwnedResources:
+    """Resolve tasklist -> task -> step owned by the user in one query.
+
+    The task and step are outer joined on their parent, so a missing row
+    comes back as NULL and the precise NotFoundException can be raised.
+    `options` are loader options for the selected entities.
+    """
+    query = select(TaskList).where(
+        TaskList.user_id == user_id,
+        TaskList.id == tasklist_id,
+        TaskList.deleted_at.is_(None),
+    )
+    if task_id is not None:
+        query = query.add_columns(Task).outerjoin(
+            Task, and_(Task.tasklist_id == TaskList.id, Task.id == task_id)
+        )
+    if step_id is not None:
+        query = query.add_columns(Step).outerjoin(
+            Step, and_(Step.task_id == Task.id, Step.id == step_id)
+        )
+
+    row = db.session.execute(query.options(*options)).unique().first()
+
+    if row is None:
+        raise NotFoundException("Tasklist not found")
+
+    resources = OwnedResources(*row)
+
+    if task_id is not None and resources.task is None:
+        raise NotFoundException("Task not found")
+
+    if step_id is not None and resources.step is None:
+        raise NotFoundException("Step not found")
+
+    return resources
@@ -0,0 +1,286 @@
+import time
+import click
+from flask import Blueprint
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update, delete
+
+from todo_app import db
+from todo_app.config import (
+    PURGE_BATCH_SIZE,
+    ARCHIVE_COMPLETED_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+)
+from todo_app.models import (
+    User,
+    UserDirectory,
+    TaskList,
+    Task,
+    Step,
+    ArchivedTask,
+    ArchivedStep,
+)
+from todo_app.sharding import SHARD_COUNT
+from todo_app.transaction import each_shard, shard_engine
+
+
+# registered by create_app, cli_group=None keeps the commands at the top level
+commands = Blueprint("maintenance", __name__, cli_group=None)
+
+
+@commands.cli.command("create-db")
+def create_db_command():
+    """Create the tables on every shard, for SQLite and test databases.
+
+    Postgres deployments use `alembic upgrade head` instead, the migrations
+    also create the full text search columns.
+    """
+    for shard in range(SHARD_COUNT):
+        db.metadata.create_all(shard_engine(shard))
+    click.echo(f"Created the tables on {SHARD_COUNT} shard(s)")
+
+
+def _delete_in_batches(model, condition, batch_size: int):
+    """Delete rows matching `condition`, `batch_size` rows per transaction"""
+    while True:
+        ids = select(model.id).where(condition).limit(batch_size).scalar_subquery()
+        result = db.session.execute(
+            delete(model).where(model.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        if result.rowcount < batch_size:
+            return
+
+
+def purge_tasklist(tasklist_id, batch_size: int = PURGE_BATCH_SIZE):
+    """Remove a tasklist bottom up: steps, then tasks, then the tasklist.
+
+    Every batch is its own short transaction, so purging a huge tasklist
+    never holds locks on thousands of rows at once.
+    """
+    for task_model, step_model in ((Task, Step), (ArchivedTask, ArchivedStep)):
+        task_ids = select(task_model.id).where(task_model.tasklist_id == tasklist_id)
+        _delete_in_batches(step_model, step_model.task_id.in_(task_ids), batch_size)
+        _delete_in_batches(
+            task_model, task_model.tasklist_id == tasklist_id, batch_size
+        )
+
+    _delete_in_batches(TaskList, TaskList.id == tasklist_id, 1)
+
+
+def purge_deleted_tasklists(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Purge every soft deleted tasklist, returns the number of tasklists"""
+    purged = 0
+    while True:
+        tasklist_id = db.session.scalar(
+            select(TaskList.id)
+            .where(TaskList.deleted_at.is_not(None))
+            .order_by(TaskList.deleted_at)
+            .limit(1)
+        )
+        if tasklist_id is None:
+            return purged
+
+        purge_tasklist(tasklist_id, batch_size)
+        purged += 1
+
+
+@commands.cli.command("purge-deleted")
+@click.option("--batch-size", default=PURGE_BATCH_SIZE, show_default=True)
+@click.option(
+    "--interval",
+    default=0,
+    help="Keep running and purge every INTERVAL seconds, 0 runs once.",
+)
+def purge_deleted_command(batch_size: int, interval: int):
+    """Remove soft deleted tasklists with their tasks and steps."""
+    while True:
+        for shard in each_shard():
+            purged = purge_deleted_tasklists(batch_size)
+            click.echo(f"Purged {purged} tasklists on shard {shard}")
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+def _copy_columns(source, target) -> list[str]:
+    return [
+        column.key
+        for column in target.__table__.columns
+        if column.key in source.__table__.columns
+    ]
+
+
+def archive_completed_tasks(
+    older_than: timedelta, batch_size: int = ARCHIVE_BATCH_SIZE
+) -> int:
+    """Move tasks completed before `older_than` ago to the archive tables.
+
+    Each batch copies the tasks and their steps with INSERT ... SELECT and
+    deletes them from the hot tables in one short transaction. Rows locked
+    by a concurrent request are skipped and picked up by the next run.
+    Returns the number of archived tasks.
+    """
+    cutoff = datetime.utcnow() - older_than
+    task_columns = _copy_columns(Task, ArchivedTask)
+    step_columns = _copy_columns(Step, ArchivedStep)
+
+    archived = 0
+    while True:
+        ids = db.session.scalars(
+            select(Task.id)
+            .where(Task.is_completed == True, Task.completed_at < cutoff)  # noqa: E712
+            .order_by(Task.completed_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            return archived
+
+        db.session.execute(
+            insert(ArchivedTask).from_select(
+                task_columns,
+                select(*[Task.__table__.c[c] for c in task_columns]).where(
+                    Task.id.in_(ids)
+                ),
+            )
+        )
+        db.session.execute(
+            insert(ArchivedStep).from_select(
+                step_columns,
+                select(*[Step.__table__.c[c] for c in step_columns]).where(
+                    Step.task_id.in_(ids)
+                ),
+            )
+        )
+        db.session.execute(
+            delete(Step).where(Step.task_id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.execute(
+            delete(Task).where(Task.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+
+        archived += len(ids)
+        if len(ids) < batch_size:
+            return archived
+
+
+@commands.cli.command("archive-completed")
+@click.option(
+    "--older-than-days", default=ARCHIVE_COMPLETED_AFTER_DAYS, show_default=True
+)
+@click.option("--batch-size", default=ARCHIVE_BATCH_SIZE, show_default=True)
+@click.option(
+    "--interval",
+    default=0,
+    help="Keep running and archive every INTERVAL seconds, 0 runs once.",
+)
+def archive_completed_command(older_than_days: int, batch_size: int, interval: int):
+    """Move old completed tasks and their steps to the archive tables."""
+    while True:
+        for shard in each_shard():
+            archived = archive_completed_tasks(
+                timedelta(days=older_than_days), batch_size
+            )
+            click.echo(f"Archived {archived} tasks on shard {shard}")
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+def _owned_rows(user_id):
+    """Select every row of the user, parents first so foreign keys hold"""
+    tasklist_ids = select(TaskList.id).where(TaskList.user_id == user_id)
+    task_ids = select(Task.id).where(Task.tasklist_id.in_(tasklist_ids))
+    archived_task_ids = select(ArchivedTask.id).where(
+        ArchivedTask.tasklist_id.in_(tasklist_ids)
+    )
+    return [
+        select(User.__table__).where(User.id == user_id),
+        select(TaskList.__table__).where(TaskList.user_id == user_id),
+        select(Task.__table__).where(Task.tasklist_id.in_(tasklist_ids)),
+        select(Step.__table__).where(Step.task_id.in_(task_ids)),
+        select(ArchivedTask.__table__).where(
+            ArchivedTask.tasklist_id.in_(tasklist_ids)
+        ),
+        select(ArchivedStep.__table__).where(
+            ArchivedStep.task_id.in_(archived_task_ids)
+        ),
+    ]
+
+
+def move_user(email: str, target: int, batch_size: int = ARCHIVE_BATCH_SIZE):
+    """Copy a user and everything it owns to the `target` shard.
+
+    The user is deactivated on its current shard while it is copied, so its
+    requests are rejected instead of writing rows that would be left behind.
+    The directory is switched once the copy is committed on the target, and
+    only then are the rows removed from the source shard. The user keeps the
+    `is_active` it had, and gets it back on the source when the move fails.
+    """
+    entry = db.session.scalars(
+        select(UserDirectory).where(UserDirectory.email == email)
+    ).one()
+    user_id = entry.user_id
+    source = entry.shard
+    # on SQLite the read holds the write lock of shard 0 until it ends
+    db.session.commit()
+    if source == target:
+        return
+
+    with shard_engine(source).begin() as connection:
+        is_active = connection.scalar(select(User.is_active).where(User.id == user_id))
+        connection.execute(
+            update(User).where(User.id == user_id).values(is_active=False)
+        )
+
+    copied = False
+    try:
+        with shard_engine(source).connect() as source_connection, shard_engine(
+            target
+        ).begin() as target_connection:
+            for query in _owned_rows(user_id):
+                table = query.get_final_froms()[0]
+                rows = source_connection.execution_options(
+                    yield_per=batch_size
+                ).execute(query)
+                for batch in rows.mappings().partitions():
+                    target_connection.execute(
+                        insert(table), [dict(row) for row in batch]
+                    )
+
+            target_connection.execute(
+                update(User).where(User.id == user_id).values(is_active=is_active)
+            )
+        copied = True
+
+        entry.shard = target
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        # the directory still points to the source, drop the partial copy
+        if copied:
+            with shard_engine(target).begin() as connection:
+                connection.execute(delete(User).where(User.id == user_id))
+        with shard_engine(source).begin() as connection:
+            connection.execute(
+                update(User).where(User.id == user_id).values(is_active=is_active)
+            )
+        raise
+
+    # everything the user owns follows with the foreign key cascades
+    with shard_engine(source).begin() as connection:
+        connection.execute(delete(User).where(User.id == user_id))
+
+
+@commands.cli.command("move-user")
+@click.argument("email")
+@click.argument("shard", type=click.IntRange(0, SHARD_COUNT - 1))
+@click.option("--batch-size", default=ARCHIVE_BATCH_SIZE, show_default=True)
+def move_user_command(email: str, shard: int, batch_size: int):
+    """Move the user with EMAIL and all its data to SHARD."""
+    move_user(email, shard, batch_size)
+    click.echo(f"Moved {email} to shard {shard}")
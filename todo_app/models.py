@@ -4,6 +4,8 @@ from datetime import datetime
 from sqlalchemy import (
     Text,
     ForeignKey,
+    Index,
+    text,
 )
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
@@ -28,6 +30,15 @@ class User(db.Model):
     tasklists: Mapped[list["TaskList"]] = relationship(back_populates="user")
 
 
+class UserDirectory(db.Model):
+    """Shard of every user, only stored in shard 0"""
+
+    __tablename__ = "user_directory"
+    user_id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    email: Mapped[str] = mapped_column(unique=True, index=True)
+    shard: Mapped[int] = mapped_column(default=0)
+
+
 class BlackListToken(db.Model):
     __tablename__ = "blacklisttokens"
     id: Mapped[uuid.UUID] = mapped_column(
@@ -40,6 +51,15 @@ class BlackListToken(db.Model):
 
 class TaskList(db.Model):
     __tablename__ = "tasklists"
+    __table_args__ = (
+        # soft deleted tasklists waiting to be purged
+        Index(
+            "ix_tasklists_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
     id: Mapped[uuid.UUID] = mapped_column(
         primary_key=True, index=True, default=uuid.uuid4
     )
@@ -47,19 +67,42 @@ class TaskList(db.Model):
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     user_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE")
+        ForeignKey("users.id", ondelete="CASCADE"), index=True
     )
     user: Mapped["User"] = relationship(back_populates="tasklists")
-    tasks: Mapped[list["Task"]] = relationship(back_populates="tasklist")
+    tasks: Mapped[list["Task"]] = relationship(
+        back_populates="tasklist", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     order: Mapped[Optional[int]] = mapped_column(default=0)
 
     created_at: Mapped[Optional[datetime]] = mapped_column(server_default=utcnow())
     updated_at: Mapped[Optional[datetime]] = mapped_column(onupdate=utcnow())
+    # soft delete marker, rows are removed by the `purge-deleted` command
+    deleted_at: Mapped[Optional[datetime]]
 
 
 class Task(db.Model):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # open tasks with a due date, serves the today/overdue/upcoming views:
+        # each view is a due_date range of one user, read in order
+        Index(
+            "ix_tasks_open_due_date",
+            "user_id",
+            "due_date",
+            "id",
+            postgresql_where=text("is_completed = false AND due_date IS NOT NULL"),
+            sqlite_where=text("is_completed = false AND due_date IS NOT NULL"),
+        ),
+        # completed tasks waiting to be moved to the archive
+        Index(
+            "ix_tasks_completed_at",
+            "completed_at",
+            postgresql_where=text("is_completed = true"),
+            sqlite_where=text("is_completed = true"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         primary_key=True, index=True, default=uuid.uuid4
@@ -68,11 +111,16 @@ class Task(db.Model):
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     tasklist_id: Mapped[Optional[uuid.UUID]] = mapped_column(
-        ForeignKey("tasklists.id", ondelete="CASCADE"), nullable=True
+        ForeignKey("tasklists.id", ondelete="CASCADE"), nullable=True, index=True
     )
     tasklist: Mapped["TaskList"] = relationship(back_populates="tasks")
-    steps: Mapped[list["Step"]] = relationship(back_populates="task")
+    # owner of the tasklist, copied here for `ix_tasks_open_due_date`
+    user_id: Mapped[Optional[uuid.UUID]]
+    steps: Mapped[list["Step"]] = relationship(
+        back_populates="task", cascade="all, delete-orphan", passive_deletes=True
+    )
     is_completed: Mapped[bool] = mapped_column(default=False)
+    completed_at: Mapped[Optional[datetime]]
 
     reminder: Mapped[Optional[datetime]]
     due_date: Mapped[Optional[datetime]]
@@ -94,9 +142,59 @@ class Step(db.Model):
     is_completed: Mapped[bool] = mapped_column(default=False)
 
     task_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("tasks.id", ondelete="CASCADE")
+        ForeignKey("tasks.id", ondelete="CASCADE"), index=True
     )
     task: Mapped["Task"] = relationship(back_populates="steps")
 
     created_at: Mapped[Optional[datetime]] = mapped_column(server_default=utcnow())
     updated_at: Mapped[Optional[datetime]] = mapped_column(onupdate=utcnow())
+
+
+# ------------- Archive of completed tasks -------------
+# Tasks completed longer than ARCHIVE_COMPLETED_AFTER_DAYS ago are moved here
+# with their steps by the `archive-completed` command, so `tasks` only holds
+# open and recently completed tasks. Archived tasks are read only.
+class ArchivedTask(db.Model):
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        Index("ix_tasks_archive_tasklist_id", "tasklist_id", "completed_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    title: Mapped[str]
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    tasklist_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("tasklists.id", ondelete="CASCADE"), nullable=True
+    )
+    steps: Mapped[list["ArchivedStep"]] = relationship(
+        back_populates="task", passive_deletes=True
+    )
+    is_completed: Mapped[bool] = mapped_column(default=True)
+    completed_at: Mapped[Optional[datetime]]
+
+    reminder: Mapped[Optional[datetime]]
+    due_date: Mapped[Optional[datetime]]
+
+    order: Mapped[Optional[int]]
+
+    created_at: Mapped[Optional[datetime]]
+    updated_at: Mapped[Optional[datetime]]
+    archived_at: Mapped[Optional[datetime]] = mapped_column(server_default=utcnow())
+
+
+class ArchivedStep(db.Model):
+    __tablename__ = "steps_archive"
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+
+    title: Mapped[str]
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    is_completed: Mapped[bool] = mapped_column(default=False)
+
+    task_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("tasks_archive.id", ondelete="CASCADE"), index=True
+    )
+    task: Mapped["ArchivedTask"] = relationship(back_populates="steps")
+
+    created_at: Mapped[Optional[datetime]]
+    updated_at: Mapped[Optional[datetime]]
@@ -0,0 +1,54 @@
+import uuid
+from sqlalchemy import select, update, func
+
+from todo_app import db
+from todo_app.transaction import uses_postgresql
+
+
+# first key of the advisory locks, the second one is the hashed scope id
+TASKLISTS_LOCK = 1
+TASKS_LOCK = 2
+
+
+def lock_siblings(namespace: int, scope_id: uuid.UUID):
+    """Serialize the writers of one ordered list until the transaction ends.
+
+    Reorders and creations of the same list (the tasklists of a user, the
+    tasks of a tasklist) queue on this lock instead of deadlocking on the
+    rows they update. Lists sharing a hash only share the queue. SQLite
+    has no advisory locks, its writers take the database write lock when
+    their transaction begins (see sqlite.py).
+    """
+    if not uses_postgresql():
+        return
+    db.session.execute(
+        select(func.pg_advisory_xact_lock(namespace, func.hashtext(str(scope_id))))
+    )
+
+
+def max_order(model, *scope) -> int:
+    return db.session.scalar(select(func.max(model.order)).where(*scope)) or 0
+
+
+def move(model, item, new_order: int, *scope):
+    """Move `item` to `new_order`, shifting the siblings in between.
+
+    The siblings are shifted by a single UPDATE, so the list is never read
+    into Python and rewritten row by row.
+    """
+    old_order = item.order
+    if old_order is None or new_order == old_order:
+        item.order = new_order
+        return
+
+    if new_order < old_order:
+        shift = model.order + 1
+        between = model.order.between(new_order, old_order - 1)
+    else:
+        shift = model.order - 1
+        between = model.order.between(old_order + 1, new_order)
+
+    db.session.execute(
+        update(model).where(*scope, model.id != item.id, between).values(order=shift)
+    )
+    item.order = new_order
@@ -1,13 +1,37 @@
-from flask import request
+import json
+import uuid
+import queue
+import logging
+from flask import Blueprint, current_app, request, g, Response
 from pydantic import ValidationError
 from pydantic.error_wrappers import ErrorWrapper
-from sqlalchemy.orm import joinedload
-from todo_app import app, db
-from todo_app.decorators import auth_required
-from todo_app.models import TaskList, Task, Step, User
-from todo_app.exceptions import NotFoundException, BadRequestException
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only
+from todo_app import db
+from todo_app.decorators import auth_required, deadline
+from todo_app.models import TaskList, Task, Step, User, ArchivedTask, UserDirectory
+from todo_app.exceptions import BadRequestException
 from todo_app.hash import get_password_hash, verify_password
 from todo_app.jwt import create_token_pair
+from todo_app.search import search
+from todo_app.smart_views import smart_view
+from todo_app.transaction import commit, use_shard
+from todo_app.sharding import shard_for_new_user
+from todo_app.fields import parse_fields, field_options, dump
+from todo_app.loaders import load_owned
+from todo_app.bulk import duplicate_tasklist, move_tasks
+from todo_app.ordering import TASKLISTS_LOCK, TASKS_LOCK, lock_siblings, max_order, move
+from todo_app.utils import utcnow
+from todo_app.cache import (
+    cached_response,
+    tasklists_key,
+    tasks_key,
+    invalidate_tasklists,
+    invalidate_tasks,
+)
+from todo_app.events import publish, broker
+from todo_app.config import EVENTS_HEARTBEAT_SECONDS
 from todo_app.schemas import (
     TaskListScheme,
     TaskScheme,
@@ -20,6 +44,13 @@ from todo_app.schemas import (
     UserRegister,
     UserLogin,
     User as UserSchema,
+    SearchQueryScheme,
+    TaskListDuplicateScheme,
+    TasksMoveScheme,
+    SearchResultScheme,
+    SmartViewQueryScheme,
+    BatchScheme,
+    BatchOperationScheme,
 )
 
 
@@ -29,44 +60,79 @@ PUT = "PUT"
 PATCH = "PATCH"
 DELETE = "DELETE"
 
+api = Blueprint("api", __name__)
+
+logger = logging.getLogger(__name__)
+
 
 # ----------------- Login, Register views -------------------
-@app.route("/login", methods=[POST])
+@api.route("/login", methods=[POST])
+@deadline(5)
 def login():
     data = UserLogin(**request.json)
-    user = User.query.filter_by(email=data.email).first()
+    user = None
+    entry = UserDirectory.query.filter_by(email=data.email).first()
+    if entry:
+        use_shard(entry.shard)
+        user = User.query.filter_by(email=data.email).first()
 
     if not user or not verify_password(data.password, user.password):
         raise BadRequestException("Incorrect email or password")
 
-    token_pair = create_token_pair(user=UserSchema.from_orm(user))
+    token_pair = create_token_pair(user=UserSchema.from_orm(user), shard=entry.shard)
 
     return {"access": token_pair.access.token, "refresh": token_pair.refresh.token}, 200
 
 
-@app.route("/register", methods=[POST])
+@api.route("/register", methods=[POST])
+@deadline(5)
 def register():
     data = UserRegister(**request.json)
-    user = User.query.filter_by(email=data.email).first()
-    if user:
+    entry = UserDirectory.query.filter_by(email=data.email).first()
+    if entry:
         raise BadRequestException("Email has already registered")
 
     # hashing password
     user_data = data.dict(exclude={"confirm_password"})
     user_data["password"] = get_password_hash(user_data["password"])
 
-    # save user to db
     user = User(**user_data)
+    user.id = uuid.uuid4()
     user.is_active = True
-
+    user_id = user.id
+    shard = shard_for_new_user(user_id)
+
+    # the user row is committed on its shard first and the directory row on
+    # shard 0 last: a user is only reachable through the directory, whose
+    # unique email index prevents registering the same email on two shards.
+    # When the directory insert fails the user row is deleted again, only a
+    # crash between the two commits leaves an unreachable user row behind,
+    # whose email can only be registered again on another shard.
+    use_shard(shard)
     db.session.add(user)
-    db.session.commit()
+    try:
+        commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        raise BadRequestException("Email has already registered") from exc
+
+    try:
+        db.session.add(UserDirectory(user_id=user_id, email=data.email, shard=shard))
+        commit()
+    except Exception as exc:
+        db.session.rollback()
+        db.session.execute(delete(User).where(User.id == user_id))
+        commit()
+        if isinstance(exc, IntegrityError):
+            raise BadRequestException("Email has already registered") from exc
+        raise
 
     return {"msg": "Successfully registered"}
 
 
 # ----------------- TaskList list, create, update order view -------------
-@app.route("/tasklist", methods=[GET, POST, PATCH])
+@api.route("/tasklist", methods=[GET, POST, PATCH])
+@deadline(3)
 @auth_required
 def tasklists_view(user):
     if request.method == POST:
@@ -74,9 +140,10 @@ def tasklists_view(user):
         tasklist = TaskList(**tasklist_data.dict())
         tasklist.user_id = user.id
 
+        lock_siblings(TASKLISTS_LOCK, user.id)
         tasklist.order = 1
         last_task = (
-            TaskList.query.filter_by(user_id=user.id)
+            TaskList.query.filter_by(user_id=user.id, deleted_at=None)
             .order_by(TaskList.order.desc(), TaskList.created_at.desc())
             .first()
         )
@@ -84,98 +151,173 @@ def tasklists_view(user):
             tasklist.order += last_task.order
 
         db.session.add(tasklist)
-        db.session.commit()
+        invalidate_tasklists(user.id)
+        publish(user.id, "created", tasklist)
+        commit()
 
         return TaskListScheme.from_orm(tasklist).dict(), 201
 
     elif request.method == PATCH:
         order_data = UpdateOrderScheme(**request.json)
 
-        query = TaskList.query.filter_by(user_id=user.id)
-
-        tasklists = query.order_by(TaskList.order.desc(), TaskList.created_at.desc())
-        tasklist = query.filter_by(id=order_data.id).first()
+        lock_siblings(TASKLISTS_LOCK, user.id)
+        scope = (TaskList.user_id == user.id, TaskList.deleted_at.is_(None))
+        tasklist = (
+            TaskList.query.filter(*scope, TaskList.id == order_data.id)
+            .populate_existing()
+            .first()
+        )
 
         if not tasklist:
             raise ValidationError(
-                errors=[ErrorWrapper(ValueError("Tasklist is not found"), loc="id")]
+                [ErrorWrapper(ValueError("Tasklist is not found"), loc="id")],
+                UpdateOrderScheme,
             )
 
-        last_order = tasklists.first()
-        if last_order.order < order_data.order:
+        if max_order(TaskList, *scope) < order_data.order:
             raise ValidationError(
-                errors=[
+                [
                     ErrorWrapper(
                         ValueError("Value is bigger than tasklists count"), loc="order"
                     )
-                ]
+                ],
+                UpdateOrderScheme,
             )
-        updated_tasklists = []
-        for tl in tasklists:
-            if tl.id == tasklist.id:
-                continue
-            c = False
-            if order_data.order <= tl.order and tasklist.order > tl.order:
-                c = True
-                tl.order += 1
-            elif order_data.order >= tl.order and tasklist.order < tl.order:
-                c = True
-                tl.order -= 1
-            if c:
-                updated_tasklists.append(tl)
-
-        tasklist.order = order_data.order
-        updated_tasklists.append(tasklist)
-        db.session.bulk_save_objects(updated_tasklists)
-        db.session.commit()
 
-    tasklists = TaskList.query.filter_by(user_id=user.id).order_by(
+        move(TaskList, tasklist, order_data.order, *scope)
+        invalidate_tasklists(user.id)
+        publish(user.id, "reordered", tasklist)
+        commit()
+
+        return _tasklists(user), 200
+
+    fields = parse_fields(TaskListScheme, request.args.get("fields"))
+    if fields:
+        return _tasklists(user, fields), 200
+
+    return cached_response(tasklists_key(user.id), lambda: _tasklists(user))
+
+
+def _tasklists(user, fields: set | None = None) -> list:
+    """Serialized tasklists of the user"""
+    tasklists = TaskList.query.filter_by(user_id=user.id, deleted_at=None).order_by(
         TaskList.order.asc(), TaskList.created_at.asc()
     )
+    if fields:
+        tasklists = tasklists.options(*field_options(TaskList, TaskListScheme, fields))
 
-    return [TaskListScheme.from_orm(tasklist).dict() for tasklist in tasklists], 200
+    return [dump(tasklist, TaskListScheme, fields) for tasklist in tasklists]
 
 
 # -------- Tasklist Detail and update view --------
-@app.route("/tasklist/<uuid:tasklist_id>", methods=[GET, PUT, DELETE])
+@api.route("/tasklist/<uuid:tasklist_id>", methods=[GET, PUT, DELETE])
+@deadline(2)
 @auth_required
 def tasklist_view(user, tasklist_id):
-    tasklist: TaskList = TaskList.query.filter_by(
-        user_id=user.id, id=tasklist_id
-    ).first()
-    if not tasklist:
-        raise NotFoundException(message="Tasklist Not Found")
+    fields = None
+    options = []
+    if request.method == GET:
+        fields = parse_fields(TaskListScheme, request.args.get("fields"))
+        if fields:
+            options = field_options(TaskList, TaskListScheme, fields)
+
+    tasklist = load_owned(user.id, tasklist_id, options=options).tasklist
 
     if request.method == PUT:
         return _tasklist_view_put(tasklist)
     elif request.method == DELETE:
-        db.session.delete(tasklist)
-        db.session.commit()
-        return None, 200
+        # tasks and steps are removed in batches by the `purge-deleted` command
+        tasklist.deleted_at = utcnow()
+        invalidate_tasklists(user.id)
+        invalidate_tasks(user.id, tasklist.id)
+        publish(user.id, "deleted", tasklist)
+        commit()
+        return {"msg": "Successfully deleted"}, 200
 
-    return TaskListScheme.from_orm(tasklist).dict(), 200
+    return dump(tasklist, TaskListScheme, fields), 200
 
 
 def _tasklist_view_put(tasklist: TaskList):
     """Update tasklist"""
-    tasklist_data = TaskListCreateScheme(**request.json())
+    tasklist_data = TaskListCreateScheme(**request.json)
 
     tasklist.title = tasklist_data.title
     tasklist.description = tasklist_data.description
-    db.session.commit()
+    invalidate_tasklists(tasklist.user_id)
+    publish(tasklist.user_id, "updated", tasklist)
+    commit()
 
     return TaskListScheme.from_orm(tasklist).dict(), 200
 
 
+@api.route("/tasklist/<uuid:tasklist_id>/duplicate", methods=[POST])
+@deadline(10)
+@auth_required
+def tasklist_duplicate_view(user, tasklist_id):
+    """Copy a tasklist with its open (or all) tasks and their steps"""
+    data = TaskListDuplicateScheme(**(request.get_json(silent=True) or {}))
+    source = load_owned(user.id, tasklist_id).tasklist
+
+    lock_siblings(TASKLISTS_LOCK, user.id)
+    scope = (TaskList.user_id == user.id, TaskList.deleted_at.is_(None))
+    tasklist = TaskList(
+        title=data.title or source.title,
+        description=source.description,
+        user_id=user.id,
+        order=max_order(TaskList, *scope) + 1,
+    )
+    db.session.add(tasklist)
+    db.session.flush()
+
+    duplicate_tasklist(source, tasklist, data.include_completed)
+    invalidate_tasklists(user.id)
+    publish(user.id, "created", tasklist)
+    commit()
+
+    return TaskListScheme.from_orm(tasklist).dict(), 201
+
+
+@api.route("/tasklist/<uuid:tasklist_id>/tasks/move", methods=[POST])
+@deadline(10)
+@auth_required
+def tasks_move_view(user, tasklist_id):
+    """Move tasks with their steps to the end of another tasklist"""
+    data = TasksMoveScheme(**request.json)
+    source = load_owned(user.id, tasklist_id).tasklist
+    target = load_owned(user.id, data.tasklist_id).tasklist
+    if source.id == target.id:
+        raise BadRequestException("Tasks are already in this tasklist")
+
+    # always lock in the same order, two opposite moves must not deadlock
+    for locked in sorted((source.id, target.id)):
+        lock_siblings(TASKS_LOCK, locked)
+
+    task_ids = set(data.task_ids)
+    moved = move_tasks(source, target, list(task_ids))
+    if moved != len(task_ids):
+        raise ValidationError(
+            [ErrorWrapper(ValueError("Task is not found"), loc="task_ids")],
+            TasksMoveScheme,
+        )
+
+    invalidate_tasks(user.id, source.id)
+    invalidate_tasks(user.id, target.id)
+    publish(user.id, "reordered", source)
+    publish(user.id, "reordered", target)
+    commit()
+
+    return {"moved": moved}, 200
+
+
 # Tasks list, create, update order view
-@app.route("/tasklist/<uuid:tasklist_id>/tasks", methods=[GET, POST, PATCH])
+@api.route("/tasklist/<uuid:tasklist_id>/tasks", methods=[GET, POST, PATCH])
+@deadline(5)
 @auth_required
 def tasks_view(user, tasklist_id):
-    tasklist: TaskList = TaskList.query.filter_by(
-        user_id=user.id, id=tasklist_id
-    ).first()
-    if not tasklist:
-        raise NotFoundException(message="Tasklist Not Found")
+    if request.method == GET:
+        return _tasks_view_get(user, tasklist_id)
+
+    tasklist = load_owned(user.id, tasklist_id).tasklist
 
     if request.method == POST:
         return _tasks_view_post(tasklist)
@@ -183,13 +325,50 @@ def tasks_view(user, tasklist_id):
     elif request.method == PATCH:
         return _tasks_view_patch(tasklist)
 
+
+def _tasks_view_get(user, tasklist_id):
+    """List tasks, the full representation is served from the cache"""
     is_completed = request.args.get("is_completed", "false") == "true"
-    return [
-        TaskScheme.from_orm(task).dict()
-        for task in Task.query.options(joinedload(Task.steps)).filter_by(
-            tasklist_id=tasklist_id, is_completed=is_completed
+    fields = parse_fields(TaskScheme, request.args.get("fields"))
+    if fields:
+        return _tasks(user, tasklist_id, is_completed, fields), 200
+
+    return cached_response(
+        tasks_key(user.id, tasklist_id, is_completed),
+        lambda: _tasks(user, tasklist_id, is_completed),
+    )
+
+
+def _tasks(user, tasklist_id, is_completed: bool, fields: set | None = None) -> list:
+    """Serialized tasks of an owned tasklist"""
+    load_owned(user.id, tasklist_id)
+
+    options = (
+        field_options(Task, TaskScheme, fields) if fields else [joinedload(Task.steps)]
+    )
+    query = Task.query.options(*options).filter_by(
+        tasklist_id=tasklist_id, is_completed=is_completed
+    )
+    if is_completed:
+        # same order as the archived tasks appended below
+        query = query.order_by(Task.completed_at.desc())
+    tasks = [dump(task, TaskScheme, fields) for task in query]
+
+    if is_completed:
+        # completed tasks older than the archive age live in tasks_archive
+        options = (
+            field_options(ArchivedTask, TaskScheme, fields)
+            if fields
+            else [joinedload(ArchivedTask.steps)]
         )
-    ], 200
+        tasks += [
+            dump(task, TaskScheme, fields)
+            for task in ArchivedTask.query.options(*options)
+            .filter_by(tasklist_id=tasklist_id)
+            .order_by(ArchivedTask.completed_at.desc())
+        ]
+
+    return tasks
 
 
 def _tasks_view_post(tasklist: TaskList):
@@ -201,8 +380,10 @@ def _tasks_view_post(tasklist: TaskList):
 
     task = Task(**task_data_dict)
     task.tasklist_id = tasklist.id
+    task.user_id = tasklist.user_id
     task.order = 1
 
+    lock_siblings(TASKS_LOCK, tasklist.id)
     last_task = (
         Task.query.filter_by(tasklist_id=tasklist.id, is_completed=False)
         .order_by(Task.order.desc(), Task.created_at.desc())
@@ -212,60 +393,43 @@ def _tasks_view_post(tasklist: TaskList):
     if last_task:
         task.order += last_task.order
 
-    db.session.add(task)
-    db.session.commit()
     if steps_data:
-        steps = [Step(**data) for data in steps_data]
-        for step in steps:
-            step.task_id = task.id
+        task.steps = [Step(**data) for data in steps_data]
 
-        db.session.add_all(steps)
-        db.session.commit()
+    db.session.add(task)
+    invalidate_tasks(tasklist.user_id, tasklist.id)
+    publish(tasklist.user_id, "created", task)
+    commit()
 
     return TaskScheme.from_orm(task).dict(), 201
 
 
 def _tasks_view_patch(tasklist: TaskList):
     """Update task order"""
-    task_data = UpdateOrderScheme(**request.json())
-    task: Task = Task.query.filter_by(tasklist_id=tasklist.id, id=task_data.id).first()
+    task_data = UpdateOrderScheme(**request.json)
+
+    lock_siblings(TASKS_LOCK, tasklist.id)
+    task: Task = (
+        Task.query.filter_by(tasklist_id=tasklist.id, id=task_data.id)
+        .populate_existing()
+        .first()
+    )
     if not task:
         raise ValidationError(
-            errors=[ErrorWrapper(ValueError("Task is not found"), loc="id")]
+            [ErrorWrapper(ValueError("Task is not found"), loc="id")],
+            UpdateOrderScheme,
         )
 
-    tasks = (
-        Task.query.filter(Task.id != task_data.id)
-        .filter_by(tasklist_id=tasklist.id)
-        .order_by(Task.order.desc(), Task.created_at.desc())
-    )
-    last_task: Task = tasks.first()
-
-    if last_task.order < task_data.order:
+    if max_order(Task, Task.tasklist_id == tasklist.id) < task_data.order:
         raise ValidationError(
-            errors=[
-                ErrorWrapper(
-                    ValueError("Value is bigger than tasks count"), loc="order"
-                )
-            ]
+            [ErrorWrapper(ValueError("Value is bigger than tasks count"), loc="order")],
+            UpdateOrderScheme,
         )
 
-    updated_tasks = []
-    for t in tasks:
-        c = False
-        if task_data.order <= t.order and task.order > t.order:
-            c = True
-            t.order += 1
-        elif task_data.order >= t.order and task.order < t.order:
-            c = True
-            t.order -= 1
-        if c:
-            updated_tasks.append(t)
-
-    task.order = task_data.order
-    updated_tasks.append(task)
-    db.session.bulk_save_objects(updated_tasks)
-    db.session.commit()
+    move(Task, task, task_data.order, Task.tasklist_id == tasklist.id)
+    invalidate_tasks(tasklist.user_id, tasklist.id)
+    publish(tasklist.user_id, "reordered", task)
+    commit()
 
     return [
         TaskScheme.from_orm(task).dict()
@@ -275,91 +439,222 @@ def _tasks_view_patch(tasklist: TaskList):
     ], 200
 
 
-@app.route(
+@api.route(
     "/tasklist/<uuid:tasklist_id>/tasks/<uuid:task_id>",
     methods=[GET, PATCH, DELETE],
 )
+@deadline(2)
 @auth_required
 def task_view(user, tasklist_id, task_id):
-    tasklist: TaskList = TaskList.query.filter_by(
-        user_id=user.id, id=tasklist_id
-    ).first()
-
-    if not tasklist:
-        raise NotFoundException("Tasklist not found")
+    fields = None
+    options = [joinedload(Task.steps)]
+    if request.method == GET:
+        fields = parse_fields(TaskScheme, request.args.get("fields"))
+        if fields:
+            options = field_options(Task, TaskScheme, fields)
 
-    task: Task = (
-        Task.query.options(joinedload(Task.steps))
-        .filter_by(tasklist_id=tasklist.id, id=task_id)
-        .first()
-    )
-
-    if not task:
-        raise NotFoundException("Task not found")
+    task = load_owned(user.id, tasklist_id, task_id, options=options).task
 
     if request.method == PATCH:
         task_data = TaskPartialUpdateSchema(**request.json).dict(exclude_unset=True)
+        was_completed = task.is_completed
         for key in Task.__table__.columns.keys():
             if key in task_data:
                 setattr(task, key, task_data[key])
-        db.session.commit()
+        if task.is_completed != was_completed:
+            task.completed_at = utcnow() if task.is_completed else None
+        invalidate_tasks(user.id, tasklist_id)
+        publish(user.id, "updated", task)
+        commit()
 
     elif request.method == DELETE:
         db.session.delete(task)
-        db.session.commit()
-        return None, 200
+        invalidate_tasks(user.id, tasklist_id)
+        publish(user.id, "deleted", task)
+        commit()
+        return {"msg": "Successfully deleted"}, 200
 
-    return TaskScheme.from_orm(task).dict(), 200
+    return dump(task, TaskScheme, fields), 200
 
 
-@app.route("/tasklist/<uuid:tasklist_id>/tasks/<uuid:task_id>/steps", methods=[POST])
+@api.route("/tasklist/<uuid:tasklist_id>/tasks/<uuid:task_id>/steps", methods=[POST])
+@deadline(2)
+@auth_required
 def steps_view(user, tasklist_id, task_id):
-    tasklist: TaskList = TaskList.query.filter_by(
-        user_id=user.id, id=tasklist_id
-    ).first()
-
-    if not tasklist:
-        raise NotFoundException("Tasklist not found")
-
-    task: Task = Task.query.filter_by(tasklist_id=tasklist.id, id=task_id).first()
-
-    if not task:
-        raise NotFoundException("Task not found")
+    task = load_owned(user.id, tasklist_id, task_id, options=[load_only(Task.id)]).task
 
     step_data = StepCreateScheme(**request.json)
-    step = Step(**step_data)
+    step = Step(**step_data.dict())
     step.task_id = task.id
     db.session.add(step)
-    db.session.commit()
+    invalidate_tasks(user.id, tasklist_id)
+    publish(user.id, "created", step, tasklist_id=tasklist_id)
+    commit()
     return StepScheme.from_orm(step).dict(), 201
 
 
-@app.route(
+@api.route(
     "/tasklist/<uuid:tasklist_id>/tasks/<uuid:task_id>/steps/<uuid:step_id>",
     methods=[PUT, DELETE],
 )
+@deadline(2)
+@auth_required
 def step_view(user, tasklist_id, task_id, step_id):
-    tasklist: TaskList = TaskList.query.filter_by(
-        user_id=user.id, id=tasklist_id
-    ).first()
-
-    if not tasklist:
-        raise NotFoundException("Tasklist not found")
-
-    task: Task = Task.query.filter_by(tasklist_id=tasklist.id, id=task_id).first()
-
-    if not task:
-        raise NotFoundException("Task not found")
-
-    step = Step.query.filter_by(id=step_id, task_id=task_id).first()
+    step = load_owned(
+        user.id, tasklist_id, task_id, step_id, options=[load_only(Task.id)]
+    ).step
 
     if request.method == DELETE:
         db.session.delete(step)
-        db.session.commit()
-        return None, 200
+        invalidate_tasks(user.id, tasklist_id)
+        publish(user.id, "deleted", step, tasklist_id=tasklist_id)
+        commit()
+        return {"msg": "Successfully deleted"}, 200
 
     step_data = StepCreateScheme(**request.json)
     step.title = step_data.title
-    db.session.commit()
+    invalidate_tasks(user.id, tasklist_id)
+    publish(user.id, "updated", step, tasklist_id=tasklist_id)
+    commit()
 
     return StepScheme.from_orm(step).dict(), 200
+
+
+# ------- Cross tasklist smart views: today, overdue, upcoming -------
+@api.route("/tasks/<any(today, overdue, upcoming):view>", methods=[GET])
+@deadline(3)
+@auth_required
+def smart_tasks_view(user, view):
+    query = SmartViewQueryScheme(**request.args)
+    fields = parse_fields(TaskScheme, query.fields)
+    options = field_options(Task, TaskScheme, fields | {"due_date"}) if fields else None
+    tasks, next_cursor = smart_view(
+        user.id, view, query.limit, query.cursor, options=options
+    )
+
+    return {
+        "results": [dump(task, TaskScheme, fields) for task in tasks],
+        "next_cursor": next_cursor,
+    }, 200
+
+
+# ----------------- Search view -------------------
+@api.route("/search", methods=[GET])
+@deadline(3)
+@auth_required
+def search_view(user):
+    query = SearchQueryScheme(**request.args)
+    results, next_cursor = search(user.id, query.q, query.limit, query.cursor)
+
+    return {
+        "results": [SearchResultScheme(**result).dict() for result in results],
+        "next_cursor": next_cursor,
+    }, 200
+
+
+# ----------------- Change feed view -------------------
+@api.route("/events", methods=[GET])
+@auth_required
+def events_view(user):
+    """Server-Sent Events stream of the user's tasklist, task and step changes.
+
+    The request's database connection is released before streaming starts,
+    an idle subscriber only costs a queue in this worker's broker.
+    """
+    user_id = user.id
+    app = current_app._get_current_object()
+
+    def stream():
+        # subscribed once the response is sent, so a response that is never
+        # iterated does not leave a subscriber behind. The request context is
+        # gone by then, the listeners are started from a fresh app context
+        with app.app_context():
+            subscription = broker.subscribe(user_id)
+        try:
+            yield f"retry: {EVENTS_HEARTBEAT_SECONDS * 1000}\n\n"
+            while True:
+                try:
+                    event = subscription.get(timeout=EVENTS_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(user_id, subscription)
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ----------------- Batch view -------------------
+BATCH_EXCLUDED_ENDPOINTS = {
+    "api.login",
+    "api.register",
+    "api.batch_view",
+    "api.events_view",
+}
+
+
+@api.route("/batch", methods=[POST])
+@deadline(10)
+@auth_required
+def batch_view(user):
+    """Run many operations against the routes above in one round-trip.
+
+    Operations run in order in a single transaction. With `atomic` the first
+    failing operation rolls back the whole batch, otherwise every operation
+    runs in its own savepoint and only the failing ones are rolled back.
+    """
+    batch_data = BatchScheme(**request.json)
+    g.batch_user = user
+
+    results = []
+    committed = True
+    for operation in batch_data.operations:
+        savepoint = None if batch_data.atomic else db.session.begin_nested()
+        status_code, body = _batch_dispatch(operation)
+        results.append({"status": status_code, "body": body})
+
+        if status_code < 400:
+            if savepoint:
+                savepoint.commit()
+        elif savepoint:
+            savepoint.rollback()
+        else:
+            committed = False
+            break
+
+    if committed:
+        db.session.commit()
+    else:
+        db.session.rollback()
+
+    return {"committed": committed, "results": results}, 200
+
+
+def _batch_dispatch(operation: BatchOperationScheme):
+    """Dispatch one batch operation, the app context and session are shared"""
+    with current_app.test_request_context(
+        operation.path, method=operation.method, json=operation.body
+    ):
+        try:
+            if (
+                request.url_rule
+                and request.url_rule.endpoint in BATCH_EXCLUDED_ENDPOINTS
+            ):
+                raise BadRequestException("Operation is not allowed in a batch")
+            rv = current_app.dispatch_request()
+        except Exception as e:
+            try:
+                rv = current_app.handle_user_exception(e)
+            except Exception:
+                # no handler: fail this operation only, like a 500 would
+                logger.exception("Batch operation failed")
+                rv = {"message": "Internal Server Error", "data": None}, 500
+
+        response = current_app.make_response(rv)
+
+    return response.status_code, response.get_json(silent=True)
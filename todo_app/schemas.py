@@ -1,6 +1,9 @@
 from typing import Optional, Union
+import uuid
 from datetime import datetime
-from pydantic import BaseModel, UUID4, EmailStr, validator
+from pydantic import BaseModel, UUID4, EmailStr, validator, constr, conint, conlist
+
+from todo_app.pagination import decode_cursor
 
 
 # ---------- User Based Schemas -------------
@@ -115,6 +118,9 @@ class StepCreateScheme(BaseModel):
 class StepScheme(StepCreateScheme):
     id: UUID4
 
+    class Config:
+        orm_mode = True
+
 
 class TaskCreateScheme(TaskBaseScheme):
     reminder: Optional[datetime]
@@ -132,3 +138,73 @@ class TaskScheme(TaskCreateScheme):
 class TaskPartialUpdateSchema(TaskPartialBaseScheme):
     reminder: Optional[datetime]
     due_date: Optional[datetime]
+    is_completed: Optional[bool]
+
+    @validator("is_completed")
+    def prevent_is_completed_none(cls, v, values, **kwargs):
+        assert v is not None, "This field is required"
+        return v
+
+
+class SmartViewQueryScheme(BaseModel):
+    limit: conint(ge=1, le=100) = 50
+    cursor: Optional[list]
+    fields: Optional[str]
+
+    @validator("cursor", pre=True)
+    def decode_due_date_cursor(cls, v, values, **kwargs):
+        if v is None:
+            return v
+        due_date, id = decode_cursor(v, 2)
+        assert isinstance(due_date, str) and isinstance(id, str), "Invalid cursor"
+        return [datetime.fromisoformat(due_date), uuid.UUID(id)]
+
+
+# ------------------ Search Schemas ----------------
+class SearchQueryScheme(BaseModel):
+    q: constr(strip_whitespace=True, min_length=1, max_length=256)
+    limit: conint(ge=1, le=100) = 20
+    cursor: Optional[list]
+
+    @validator("cursor", pre=True)
+    def decode_search_cursor(cls, v, values, **kwargs):
+        if v is None:
+            return v
+        rank, kind, id = decode_cursor(v, 3)
+        assert kind in ("task", "step"), "Invalid cursor"
+        assert isinstance(id, str), "Invalid cursor"
+        return [float(rank), kind, uuid.UUID(id)]
+
+
+class SearchResultScheme(BaseModel):
+    type: str
+    id: UUID4
+    tasklist_id: UUID4
+    task_id: UUID4
+    title: str
+    title_highlight: Optional[str]
+    description_highlight: Optional[str]
+    rank: float
+
+
+# ------------------ Batch Schemas ----------------
+class BatchOperationScheme(BaseModel):
+    method: constr(regex=r"^(GET|POST|PUT|PATCH|DELETE)$")
+    path: constr(regex=r"^/")
+    body: Optional[Union[dict, list]]
+
+
+class BatchScheme(BaseModel):
+    atomic: bool = False
+    operations: conlist(BatchOperationScheme, min_items=1, max_items=100)
+
+
+# ---------- Bulk Schemas -------------
+class TaskListDuplicateScheme(BaseModel):
+    title: Optional[str]
+    include_completed: bool = False
+
+
+class TasksMoveScheme(BaseModel):
+    tasklist_id: UUID4
+    task_ids: conlist(UUID4, min_items=1, max_items=500)
@@ -0,0 +1,138 @@
+import uuid
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from todo_app import db
+from todo_app.models import TaskList, Task, Step
+from todo_app.pagination import encode_cursor
+from todo_app.transaction import uses_postgresql
+
+
+# Both `tasks.search_vector` and `steps.search_vector` are generated columns
+# (title weighted A, description weighted B) with a GIN index, created by the
+# `add_search_vectors` migration. They are not mapped on the models so that
+# they are never loaded or written by the ORM.
+SEARCH_CONFIG = sa.literal_column("'english'::regconfig")
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20"
+
+task_vector = sa.literal_column("tasks.search_vector", TSVECTOR)
+step_vector = sa.literal_column("steps.search_vector", TSVECTOR)
+
+
+def _match(model, vector, tsquery, q: str):
+    """(condition, rank) of the rows of `model` matching `q`"""
+    if tsquery is not None:
+        # ts_rank_cd is a float4, the cursor is compared to it as a float8: one
+        # precision for both, or the rows tied with the end of a page are lost
+        rank = sa.cast(sa.func.ts_rank_cd(vector, tsquery), sa.Double)
+        return vector.bool_op("@@")(tsquery), rank
+
+    # without the Postgres full text index: a substring match, ranked alike
+    condition = sa.or_(
+        model.title.icontains(q, autoescape=True),
+        model.description.icontains(q, autoescape=True),
+    )
+    return condition, sa.literal(0.0)
+
+
+def _highlight(column, tsquery):
+    if tsquery is None:
+        return column
+    return sa.func.ts_headline(SEARCH_CONFIG, column, tsquery, HEADLINE_OPTIONS)
+
+
+def search(user_id: uuid.UUID, q: str, limit: int, cursor: list | None = None):
+    """Rank the user's tasks and steps matching `q`.
+
+    Results are ordered by (rank desc, type, id) and paginated with a keyset
+    cursor on that key. Highlights are only computed for the returned page.
+    """
+    tsquery = None
+    if uses_postgresql():
+        tsquery = sa.func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    task_match, task_rank = _match(Task, task_vector, tsquery, q)
+    step_match, step_rank = _match(Step, step_vector, tsquery, q)
+
+    tasks = (
+        sa.select(
+            sa.literal("task").label("type"),
+            Task.id.label("id"),
+            Task.tasklist_id.label("tasklist_id"),
+            Task.id.label("task_id"),
+            Task.title.label("title"),
+            Task.description.label("description"),
+            task_rank.label("rank"),
+        )
+        .select_from(Task)
+        .join(TaskList, TaskList.id == Task.tasklist_id)
+        .where(
+            TaskList.user_id == user_id,
+            TaskList.deleted_at.is_(None),
+            task_match,
+        )
+    )
+    steps = (
+        sa.select(
+            sa.literal("step").label("type"),
+            Step.id.label("id"),
+            Task.tasklist_id.label("tasklist_id"),
+            Step.task_id.label("task_id"),
+            Step.title.label("title"),
+            Step.description.label("description"),
+            step_rank.label("rank"),
+        )
+        .select_from(Step)
+        .join(Task, Task.id == Step.task_id)
+        .join(TaskList, TaskList.id == Task.tasklist_id)
+        .where(
+            TaskList.user_id == user_id,
+            TaskList.deleted_at.is_(None),
+            step_match,
+        )
+    )
+    matches = sa.union_all(tasks, steps).subquery("matches")
+
+    page = sa.select(matches)
+    if cursor:
+        rank, type, id = cursor
+        page = page.where(
+            sa.or_(
+                matches.c.rank < rank,
+                sa.and_(
+                    matches.c.rank == rank,
+                    sa.tuple_(matches.c.type, matches.c.id) > sa.tuple_(type, id),
+                ),
+            )
+        )
+    page = (
+        page.order_by(matches.c.rank.desc(), matches.c.type, matches.c.id)
+        .limit(limit + 1)
+        .subquery("page")
+    )
+
+    rows = (
+        db.session.execute(
+            sa.select(
+                page.c.type,
+                page.c.id,
+                page.c.tasklist_id,
+                page.c.task_id,
+                page.c.title,
+                page.c.rank,
+                _highlight(page.c.title, tsquery).label("title_highlight"),
+                _highlight(sa.func.coalesce(page.c.description, ""), tsquery).label(
+                    "description_highlight"
+                ),
+            ).order_by(page.c.rank.desc(), page.c.type, page.c.id)
+        )
+        .mappings()
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["rank"], last["type"], last["id"])
+
+    return rows, next_cursor
@@ -0,0 +1,49 @@
+import uuid
+from typing import Optional
+from sqlalchemy import inspect
+from sqlalchemy.sql.util import find_tables
+from flask_sqlalchemy.session import Session
+
+from todo_app.config import SHARD_URLS
+
+
+# Shard 0 is the default database (SQLALCHEMY_DATABASE_URI), shards 1..N are
+# SHARD_URLS. Tables listed here only live in shard 0, every other table is
+# owned by a user and read from and written to the shard of that user.
+GLOBAL_TABLES = {"user_directory", "blacklisttokens"}
+
+SHARD_COUNT = 1 + len(SHARD_URLS)
+
+
+def shard_bind_key(shard: int) -> Optional[str]:
+    return None if shard == 0 else f"shard{shard}"
+
+
+def shard_binds() -> dict:
+    """SQLALCHEMY_BINDS of the extra shards"""
+    return {shard_bind_key(i): url for i, url in enumerate(SHARD_URLS, start=1)}
+
+
+def shard_for_new_user(user_id: uuid.UUID) -> int:
+    return user_id.int % SHARD_COUNT
+
+
+def _only_global_tables(mapper, clause) -> bool:
+    if mapper is not None:
+        tables = {inspect(mapper).local_table.name}
+    elif clause is not None:
+        tables = {table.name for table in find_tables(clause, include_crud=True)}
+    else:
+        tables = set()
+    return bool(tables) and tables <= GLOBAL_TABLES
+
+
+class ShardedSession(Session):
+    """Session routing user owned tables to the shard in `info["shard"]`"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        shard = self.info.get("shard", 0)
+        if bind is None and shard and not _only_global_tables(mapper, clause):
+            return self._db.engines[shard_bind_key(shard)]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import selectinload
+
+from todo_app import db
+from todo_app.models import TaskList, Task
+from todo_app.pagination import encode_cursor
+
+
+TODAY = "today"
+OVERDUE = "overdue"
+UPCOMING = "upcoming"
+
+
+def _due_date_window(view: str):
+    """Due date condition of a view, days are UTC days"""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+
+    if view == TODAY:
+        return Task.due_date >= today, Task.due_date < tomorrow
+    elif view == OVERDUE:
+        return (Task.due_date < today,)
+    return (Task.due_date >= tomorrow,)
+
+
+def smart_view(
+    user_id: uuid.UUID,
+    view: str,
+    limit: int,
+    cursor: list | None = None,
+    options: list | None = None,
+):
+    """Open tasks across all of the user's tasklists ordered by due date.
+
+    The predicates match `ix_tasks_open_due_date`, a page is one range scan
+    of the partial index in (due_date, id) order that stops after `limit`
+    rows. `options` replace the default loader options, e.g. for sparse
+    fieldsets.
+    """
+    query = (
+        select(Task)
+        .join(TaskList, TaskList.id == Task.tasklist_id)
+        .where(
+            Task.user_id == user_id,
+            TaskList.deleted_at.is_(None),
+            Task.is_completed == False,  # noqa: E712, must match the index predicate
+            *_due_date_window(view),
+        )
+        .options(*(options or [selectinload(Task.steps)]))
+        .order_by(Task.due_date.asc(), Task.id.asc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(tuple_(Task.due_date, Task.id) > tuple_(*cursor))
+
+    tasks = db.session.execute(query).scalars().all()
+
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = encode_cursor(tasks[-1].due_date.isoformat(), tasks[-1].id)
+
+    return tasks, next_cursor
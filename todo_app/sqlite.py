@@ -0,0 +1,56 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+
+# WAL lets readers run while one writer commits, NORMAL only syncs at
+# checkpoints (safe with WAL), and busy_timeout makes a second writer wait
+# for the lock instead of failing at once with "database is locked".
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+    "cache_size": -20000,  # KiB
+    "mmap_size": 128 * 1024 * 1024,
+}
+
+READ_METHODS = {"GET", "HEAD"}
+
+
+def _begin_statement() -> str:
+    """BEGIN of read only requests, BEGIN IMMEDIATE of everything else.
+
+    IMMEDIATE takes the write lock up front, so the reads a write depends on
+    (the last order of a list) happen under the lock. Read only requests
+    keep a deferred transaction and run alongside the writer. A batch owns
+    one transaction for all its operations, whatever their methods.
+    """
+    if (
+        has_request_context()
+        and request.method in READ_METHODS
+        and not g.get("batch_user")
+    ):
+        return "BEGIN"
+    return "BEGIN IMMEDIATE"
+
+
+def configure_sqlite(engine):
+    """Apply PRAGMAS to every new connection of a SQLite engine.
+
+    pysqlite begins transactions itself, only before DML, and commits when
+    a SAVEPOINT is released. It is switched to autocommit and the
+    transactions are begun by SQLAlchemy instead.
+    """
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql(_begin_statement())
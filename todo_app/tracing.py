@@ -0,0 +1,198 @@
+import json
+import time
+import uuid
+import random
+import logging
+import threading
+from flask import Flask, g, request, has_request_context
+from sqlalchemy import event
+
+from todo_app.config import (
+    LOG_LEVEL,
+    SLOW_REQUEST_MS,
+    SLOW_QUERY_MS,
+    SLOW_QUERY_EXPLAIN_SAMPLE,
+    SLOW_QUERY_EXPLAINS_PER_MINUTE,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# attributes of every LogRecord, anything else was passed with `extra`
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+EXPLAIN = {
+    "postgresql": "EXPLAIN (ANALYZE off, FORMAT JSON) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+# ----------------- Logging -------------------
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the request id of the current request"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if has_request_context() and "request_id" in g:
+            entry["request_id"] = g.request_id
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging():
+    """Send the records of every todo_app logger to stderr as JSON"""
+    root = logging.getLogger("todo_app")
+    if root.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+
+# ----------------- Requests -------------------
+def _start_request():
+    g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    g.request_start = time.perf_counter()
+    g.db_queries = 0
+    g.db_time = 0.0
+
+
+def _log_request(response):
+    if "request_start" not in g:
+        return response
+
+    duration_ms = (time.perf_counter() - g.request_start) * 1000
+    response.headers["X-Request-ID"] = g.request_id
+    logger.log(
+        logging.WARNING if duration_ms > SLOW_REQUEST_MS else logging.INFO,
+        "request",
+        extra={
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 2),
+            "db_queries": g.db_queries,
+            "db_ms": round(g.db_time * 1000, 2),
+        },
+    )
+    return response
+
+
+def trace_requests(app: Flask):
+    app.before_request(_start_request)
+    app.after_request(_log_request)
+
+
+# ----------------- Queries -------------------
+class RateLimit:
+    """Allow `per_minute` events per minute, as a token bucket"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.capacity / 60
+            )
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+explain_limit = RateLimit(SLOW_QUERY_EXPLAINS_PER_MINUTE)
+
+
+def _parameter_shapes(parameters, executemany: bool):
+    """Types of the bound values, the values themselves are never logged"""
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "first": _parameter_shapes(rows[0], False)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def _explain(dialect: str, dbapi_connection, statement: str, parameters):
+    cursor = dbapi_connection.cursor()
+    try:
+        if dialect == "postgresql":
+            # an error would abort the request's transaction, keep it apart
+            cursor.execute("SAVEPOINT explain_slow_query")
+        try:
+            cursor.execute(EXPLAIN[dialect] + statement, parameters)
+            return cursor.fetchall()
+        except Exception:
+            if dialect == "postgresql":
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+            raise
+        finally:
+            if dialect == "postgresql":
+                cursor.execute("RELEASE SAVEPOINT explain_slow_query")
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # kept on the execution context, which is dropped with a failed statement
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    duration = time.perf_counter() - start
+    if has_request_context() and "db_queries" in g:
+        g.db_queries += 1
+        g.db_time += duration
+
+    if duration * 1000 <= SLOW_QUERY_MS:
+        return
+
+    entry = {
+        "duration_ms": round(duration * 1000, 2),
+        "statement": statement,
+        "parameters": _parameter_shapes(parameters, executemany),
+    }
+    dialect = conn.dialect.name
+    if (
+        dialect in EXPLAIN
+        and not executemany
+        and statement.lstrip().upper().startswith(EXPLAINABLE)
+        and random.random() < SLOW_QUERY_EXPLAIN_SAMPLE
+        and explain_limit.allow()
+    ):
+        try:
+            entry["plan"] = _explain(dialect, cursor.connection, statement, parameters)
+        except Exception as e:
+            entry["plan_error"] = str(e)
+
+    logger.warning("slow query", extra=entry)
+
+
+def trace_queries(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,38 @@
+from flask import g
+
+from todo_app import db
+from todo_app.sharding import SHARD_COUNT, shard_bind_key
+
+
+def commit():
+    """Commit the current unit of work.
+
+    Inside a `/batch` request the batch view owns the transaction, so the
+    changes are only flushed and committed (or rolled back) by the batch.
+    """
+    if g.get("batch_user"):
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def uses_postgresql() -> bool:
+    """Whether the current shard runs Postgres, guards Postgres only features"""
+    return db.session.get_bind().dialect.name == "postgresql"
+
+
+def use_shard(shard: int):
+    """Route the user owned tables of the current session to `shard`"""
+    db.session.info["shard"] = shard
+
+
+def shard_engine(shard: int):
+    return db.engines[shard_bind_key(shard)]
+
+
+def each_shard():
+    """Iterate over the shards, routing the session to each of them in turn"""
+    for shard in range(SHARD_COUNT):
+        use_shard(shard)
+        yield shard
+    use_shard(0)
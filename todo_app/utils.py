@@ -1,6 +1,6 @@
 from sqlalchemy.sql import expression
 from sqlalchemy.ext.compiler import compiles
-from sqlalchemy.types import DateTime
+from sqlalchemy.types import DateTime, Uuid
 
 
 class utcnow(expression.FunctionElement):
@@ -11,3 +11,32 @@ class utcnow(expression.FunctionElement):
 @compiles(utcnow, "postgresql")
 def pg_utcnow(element, compiler, **kw):
     return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def sqlite_utcnow(element, compiler, **kw):
+    # 'now' is UTC, same text format as the DateTime values SQLAlchemy writes
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+class new_uuid(expression.FunctionElement):
+    """Random UUID generated by the database, for INSERT ... SELECT"""
+
+    type = Uuid()
+    inherit_cache = True
+
+
+@compiles(new_uuid, "postgresql")
+def pg_new_uuid(element, compiler, **kw):
+    return "gen_random_uuid()"
+
+
+@compiles(new_uuid, "sqlite")
+def sqlite_new_uuid(element, compiler, **kw):
+    # a version 4 UUID as the 32 hex digits sqlalchemy.Uuid stores on SQLite
+    return (
+        "lower(hex(randomblob(4)) || hex(randomblob(2)) || '4' || "
+        "substr(hex(randomblob(2)), 2) || "
+        "substr('89ab', 1 + abs(random()) % 4, 1) || "
+        "substr(hex(randomblob(2)), 2) || hex(randomblob(6)))"
+    )